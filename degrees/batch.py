@@ -0,0 +1,132 @@
+"""
+Batch shortest paths for many (source, target) pairs of person ints.
+
+Pairs are grouped so each BFS tree is built once and answers every pair
+it touches. The groups are spread over a process pool; the CSR arrays are
+copied once into a shared memory block that every worker maps, so the
+graph is never pickled.
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from graph import INDEX, Adjacency, path_from_tree, reverse_path
+
+
+CSR_ARRAYS = ("person_offsets", "person_movies",
+              "movie_offsets", "movie_people")
+
+# Adjacency attached to the shared block, one per worker process
+_adjacency = None
+_shared = None
+
+
+def batch_shortest_paths(graph, pairs, workers=None):
+    """
+    Returns a dict mapping each (source, target) pair of person ints to its
+    shortest path of (movie, person) ints, or None if they are not connected.
+
+    Pairs are grouped by whichever endpoint is repeated more, so "every
+    person against a few stars" builds one tree per star. With workers=0
+    everything runs in the calling process.
+    """
+    results = {}
+    pairs = list(dict.fromkeys(pairs))
+    # People in different components need no search at all
+    for pair in pairs:
+        if not graph.connected(*pair):
+            results[pair] = None
+    pairs = [pair for pair in pairs if pair not in results]
+
+    by_source = group_pairs(pairs)
+    by_target = group_pairs((target, source) for source, target in pairs)
+    reverse = len(by_target) < len(by_source)
+    groups = by_target if reverse else by_source
+
+    if workers == 0:
+        for root, others in groups.items():
+            results.update(_answer(graph, root, others, reverse))
+        return results
+
+    shared, layout = share_adjacency(graph)
+    try:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shared.name, layout)) as pool:
+            jobs = [pool.submit(_worker, root, others, reverse)
+                    for root, others in groups.items()]
+            for job in jobs:
+                results.update(job.result())
+    finally:
+        shared.close()
+        shared.unlink()
+    return results
+
+
+def group_pairs(pairs):
+    """
+    Groups (root, other) pairs into {root: [others]}.
+    """
+    groups = defaultdict(list)
+    for root, other in pairs:
+        groups[root].append(other)
+    return groups
+
+
+def share_adjacency(graph):
+    """
+    Copies the CSR arrays of `graph` into a new shared memory block.
+
+    Returns the block and its layout, a list of (offset, length) per array.
+    """
+    views = [memoryview(getattr(graph, name)).cast("B")
+             for name in CSR_ARRAYS]
+    shared = shared_memory.SharedMemory(
+        create=True, size=max(1, sum(view.nbytes for view in views))
+    )
+    layout = []
+    offset = 0
+    for view in views:
+        shared.buf[offset:offset + view.nbytes] = view
+        layout.append((offset, view.nbytes))
+        offset += view.nbytes
+    return shared, layout
+
+
+def attach_adjacency(name, layout):
+    """
+    Maps a block written by `share_adjacency` and returns it together with
+    an Adjacency reading straight from it.
+    """
+    shared = shared_memory.SharedMemory(name=name)
+    arrays = [shared.buf[offset:offset + nbytes].cast(INDEX)
+              for offset, nbytes in layout]
+    return shared, Adjacency(*arrays)
+
+
+def _attach(name, layout):
+    global _shared, _adjacency
+    _shared, _adjacency = attach_adjacency(name, layout)
+
+
+def _worker(root, others, reverse):
+    return _answer(_adjacency, root, others, reverse)
+
+
+def _answer(adjacency, root, others, reverse):
+    """
+    Builds one BFS tree from `root` and reads every requested path off it.
+    """
+    tree = adjacency.search_tree(root, others)
+    results = {}
+    for other in others:
+        path = path_from_tree(tree, other)
+        if reverse:
+            if path is not None:
+                path = reverse_path(root, path)
+            results[(other, root)] = path
+        else:
+            results[(root, other)] = path
+    return results
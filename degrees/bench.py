@@ -0,0 +1,511 @@
+"""
+Benchmark harness for the shortest_path implementations in this directory.
+
+A synthetic bipartite actor/movie dataset is written as CSVs (same format
+as small/ and large/), and every engine answers the same random queries.
+Each query is run twice:
+
+  1. plain, for the wall time;
+  2. instrumented and under tracemalloc, for the nodes expanded, the peak
+     frontier size and the peak memory allocated during the search.
+
+The dict-based scripts (degrees.py, degrees1.py ... degrees4.py) are
+instrumented by temporarily swapping their module-level
+neighbors_for_person / frontier class for counting wrappers, so their
+code is measured unchanged. The landmark A* (landmarks.py) runs on a
+small index built for the synthetic graph, and the filtered BFS
+(filters.py) with a filter every movie on a path passes. Modules that
+fail to import are reported with their error instead of results.
+
+Usage: python bench.py generate directory people movies [cast] [seed]
+       python bench.py run directory [queries] [output]
+"""
+
+import csv
+import importlib
+import json
+import os
+import random
+import statistics
+import sys
+import heapq
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from graph import load_graph, path_from_tree
+
+
+# Dict-based scripts and the search functions of each to benchmark
+MODULE_ENGINES = (
+    ("degrees", "shortest_path"),
+    ("degrees", "shortest_path_bidirectional"),
+    ("degrees1", "shortest_path"),
+    ("degrees2", "shortest_path"),
+    ("degrees3", "shortest_path"),
+    ("degrees4", "shortest_path"),
+)
+
+# Landmarks in the index the A* engine is benchmarked with
+LANDMARKS = 4
+
+# Filter for filters.shortest_path that keeps every movie with a cast,
+# so its answers match the unfiltered engines
+FILTER = "cast > 0"
+
+
+class Probe():
+    """
+    Counters filled in by the instrumented engines during one query.
+    """
+    def __init__(self):
+        self.expanded = 0
+        self.peak_frontier = 0
+
+    def frontier(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+
+def generate(directory, num_people, num_movies, cast=4, seed=0):
+    """
+    Writes a random people.csv / movies.csv / stars.csv dataset to
+    `directory`.
+
+    Cast sizes average `cast`, and people are picked with Zipf-like
+    weights so that a few are in many movies and most in one or two,
+    as in the IMDB data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    person_ids = [str(100 + i) for i in range(num_people)]
+    movie_ids = [str(1000000 + i) for i in range(num_movies)]
+    weights = [1 / (rank + 1) for rank in range(num_people)]
+    rng.shuffle(weights)
+    cum_weights = []
+    total = 0
+    for weight in weights:
+        total += weight
+        cum_weights.append(total)
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        f.write("id,name,birth\n")
+        for i, person_id in enumerate(person_ids):
+            writer.writerow([int(person_id), f"Person {i}",
+                             rng.randint(1920, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        f.write("id,title,year\n")
+        for i, movie_id in enumerate(movie_ids):
+            writer.writerow([int(movie_id), f"Movie {i}",
+                             rng.randint(1950, 2020)])
+
+    with open(os.path.join(directory, "stars.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        f.write("person_id,movie_id\n")
+        for movie_id in movie_ids:
+            size = rng.randint(1, 2 * cast - 1)
+            stars = set(rng.choices(person_ids, cum_weights=cum_weights,
+                                    k=size))
+            for person_id in sorted(stars):
+                f.write(f"{person_id},{movie_id}\n")
+
+
+def pick_queries(graph, count, seed=0):
+    """
+    Returns `count` random (source, target) pairs of distinct, connected
+    person ints.
+    """
+    rng = random.Random(seed)
+    # Pick sources from the largest component, where searches are longest
+    sizes = graph.component_sizes
+    largest = max(range(len(sizes)), key=sizes.__getitem__)
+    people = [person for person in range(graph.num_people)
+              if graph.component[person] == largest]
+    if len(people) < 2:
+        return []
+    return [tuple(rng.sample(people, 2)) for _ in range(count)]
+
+
+def engines(graph, directory):
+    """
+    Yields (name, search, instrument) for every engine that loads, or
+    (name, None, error) for the ones that do not.
+
+    `search(source, target)` takes and returns person ints like
+    Graph.shortest_path. `instrument(probe)` is a context manager that
+    makes the engine report into `probe` while it is active.
+    """
+    loaded = {}
+    for module_name, function_name in MODULE_ENGINES:
+        name = f"{module_name}.{function_name}"
+        if module_name not in loaded:
+            try:
+                module = importlib.import_module(module_name)
+                module.load_data(directory)
+            except Exception as e:
+                module = f"{type(e).__name__}: {e}"
+            loaded[module_name] = module
+        module = loaded[module_name]
+        if isinstance(module, str):
+            yield name, None, module
+            continue
+        yield (name, module_search(graph, module, function_name),
+               module_instrument(module))
+
+    yield "graph.shortest_path", graph.shortest_path, array_instrument()
+    yield ("graph.shortest_path_nodes", graph.shortest_path_nodes,
+           graph_instrument(graph))
+    yield ("graph.search_tree", tree_search(graph),
+           levels_instrument(graph))
+
+    import filters
+    import landmarks
+    try:
+        index = landmarks.LandmarkIndex.build(graph, LANDMARKS)
+    except ValueError as e:
+        yield "landmarks.LandmarkIndex.shortest_path", None, f"ValueError: {e}"
+    else:
+        yield ("landmarks.LandmarkIndex.shortest_path", index.shortest_path,
+               astar_instrument(graph, landmarks))
+    yield ("filters.shortest_path", filtered_search(graph, filters),
+           levels_instrument(graph))
+
+    try:
+        import vectorized
+    except ImportError as e:
+        yield "vectorized.shortest_path", None, f"ImportError: {e}"
+    else:
+        yield ("vectorized.shortest_path", vectorized_search(graph),
+               vectorized_instrument(vectorized))
+
+
+def module_search(graph, module, function_name):
+    """
+    Wraps a dict-based script's search to take and return person ints.
+    """
+    function = getattr(module, function_name)
+    person_ids = graph.person_ids
+    person_index = graph.person_index
+    movie_index = graph.movie_index
+
+    def search(source, target):
+        path = function(person_ids[source], person_ids[target])
+        if path is None:
+            return None
+        return [(movie_index.get(movie_id), person_index[person_id])
+                for movie_id, person_id in path]
+    return search
+
+
+def module_instrument(module):
+    def instrument(probe):
+        neighbors_for_person = module.neighbors_for_person
+        replacements = {"neighbors_for_person": counted(neighbors_for_person,
+                                                        probe)}
+        if hasattr(module, "DequeQueueFrontier"):
+            replacements["DequeQueueFrontier"] = counting_frontier(
+                module.DequeQueueFrontier, probe
+            )
+        if hasattr(module, "_expand_level"):
+            replacements["_expand_level"] = measured_level(
+                module._expand_level, probe
+            )
+        return patched(module, replacements)
+    return instrument
+
+
+def array_instrument():
+    """
+    The parent-array BFS is measured through its deque: a popleft is an
+    expansion.
+    """
+    import graph as graph_module
+
+    def instrument(probe):
+        class CountingDeque(deque):
+            def popleft(self):
+                probe.expanded += 1
+                return super().popleft()
+
+            def append(self, item):
+                super().append(item)
+                probe.frontier(len(self))
+        return patched(graph_module, {"deque": CountingDeque})
+    return instrument
+
+
+def graph_instrument(graph):
+    import graph as graph_module
+
+    def instrument(probe):
+        return patched_all([
+            (graph, {"neighbors_for_person": counted(
+                graph.neighbors_for_person, probe
+            )}),
+            (graph_module, {"DequeQueueFrontier": counting_frontier(
+                graph_module.DequeQueueFrontier, probe
+            )}),
+        ])
+    return instrument
+
+
+def tree_search(graph):
+    def search(source, target):
+        if source == target:
+            return []
+        if not graph.connected(source, target):
+            return None
+        return path_from_tree(graph.search_tree(source, [target]), target)
+    return search
+
+
+def levels_instrument(graph):
+    def instrument(probe):
+        bfs_levels = graph.bfs_levels
+
+        def counted_levels(*args, **kwargs):
+            for level in bfs_levels(*args, **kwargs):
+                probe.frontier(len(level))
+                yield level
+                # Resumed: the whole level is being expanded
+                probe.expanded += len(level)
+        return patched(graph, {"bfs_levels": counted_levels})
+    return instrument
+
+
+def astar_instrument(graph, landmarks):
+    """
+    A* is measured through its neighbour calls (one per person popped and
+    expanded) and the size of its heap.
+    """
+    def instrument(probe):
+        def heappush(heap, item):
+            heapq.heappush(heap, item)
+            probe.frontier(len(heap))
+        counting_heapq = SimpleNamespace(heappush=heappush,
+                                         heappop=heapq.heappop)
+        return patched_all([
+            (graph, {"neighbors_for_person": counted(
+                graph.neighbors_for_person, probe
+            )}),
+            (landmarks, {"heapq": counting_heapq}),
+        ])
+    return instrument
+
+
+def filtered_search(graph, filters):
+    def search(source, target):
+        return filters.shortest_path(graph, source, target, FILTER)
+    return search
+
+
+def vectorized_search(graph):
+    from vectorized import shortest_path
+
+    def search(source, target):
+        return shortest_path(graph, source, target)
+    return search
+
+
+def vectorized_instrument(vectorized):
+    """
+    The vectorized BFS has no per-node hook; the counts are read back from
+    the distance array of each search it runs.
+    """
+    def instrument(probe):
+        original = vectorized.VectorizedBFS
+
+        class CountedBFS(original):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                reached = self.distance[self.distance >= 0]
+                levels = [int(n) for n in
+                          vectorized.np.bincount(reached)]
+                probe.expanded += sum(levels[:-1])
+                probe.frontier(max(levels))
+        return patched(vectorized, {"VectorizedBFS": CountedBFS})
+    return instrument
+
+
+def counted(neighbors_for_person, probe):
+    """
+    Wraps a neighbors_for_person function to count expansions.
+    """
+    def wrapper(person):
+        probe.expanded += 1
+        return neighbors_for_person(person)
+    return wrapper
+
+
+def counting_frontier(base, probe):
+    """
+    Returns a subclass of frontier class `base` that reports its size.
+    """
+    class CountingFrontier(base):
+        def add(self, node):
+            super().add(node)
+            probe.frontier(len(self.frontier))
+    return CountingFrontier
+
+
+def measured_level(expand_level, probe):
+    """
+    Wraps degrees._expand_level to report the size of each BFS level.
+    """
+    def wrapper(frontier, parents, other_parents):
+        probe.frontier(len(frontier))
+        next_frontier, meeting = expand_level(frontier, parents,
+                                              other_parents)
+        probe.frontier(len(next_frontier))
+        return next_frontier, meeting
+    return wrapper
+
+
+@contextmanager
+def patched(target, replacements):
+    """
+    Sets attributes of `target` for the duration of the block.
+    """
+    missing = object()
+    saved = {name: target.__dict__.get(name, missing)
+             for name in replacements}
+    for name, value in replacements.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is missing:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
+
+
+@contextmanager
+def patched_all(targets):
+    if not targets:
+        yield
+        return
+    (target, replacements), rest = targets[0], targets[1:]
+    with patched(target, replacements), patched_all(rest):
+        yield
+
+
+def run_query(search, instrument, source, target):
+    """
+    Runs one query plainly for its time, then instrumented for its counts
+    and memory. Returns a result dict.
+    """
+    result = {"source": source, "target": target}
+    try:
+        start = time.perf_counter()
+        path = search(source, target)
+        result["seconds"] = time.perf_counter() - start
+
+        probe = Probe()
+        with instrument(probe):
+            tracemalloc.start()
+            try:
+                search(source, target)
+                result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    result["degrees"] = None if path is None else len(path)
+    result["expanded"] = probe.expanded
+    result["peak_frontier"] = probe.peak_frontier
+    return result
+
+
+def benchmark(directory, num_queries=20, seed=0):
+    """
+    Runs every engine on the same random queries over the dataset in
+    `directory` and returns the report as a JSON-serialisable dict.
+    """
+    graph = load_graph(directory)
+    queries = pick_queries(graph, num_queries, seed)
+    # Level-synchronous BFS as the reference answer for every engine
+    reference = tree_search(graph)
+    expected = [len(reference(source, target)) for source, target in queries]
+
+    report = {
+        "dataset": {"directory": directory, "people": graph.num_people,
+                    "movies": graph.num_movies,
+                    "stars": len(graph.person_movies)},
+        "queries": [[graph.person_ids[source], graph.person_ids[target]]
+                    for source, target in queries],
+        "engines": {},
+    }
+    for name, search, instrument in engines(graph, directory):
+        if search is None:
+            report["engines"][name] = {"error": instrument}
+            continue
+        results = [run_query(search, instrument, source, target)
+                   for source, target in queries]
+        for result, degrees in zip(results, expected):
+            if "error" not in result:
+                result["correct"] = result["degrees"] == degrees
+        report["engines"][name] = {"summary": summarize(results),
+                                   "results": results}
+    return report
+
+
+def summarize(results):
+    """
+    Returns medians over an engine's query results, with totals for time
+    and work and maxima for the peaks.
+    """
+    ok = [result for result in results if "error" not in result]
+    summary = {"queries": len(results), "errors": len(results) - len(ok),
+               "incorrect": sum(not result["correct"] for result in ok)}
+    if ok:
+        for key in ("seconds", "expanded", "peak_frontier", "peak_bytes"):
+            values = [result[key] for result in ok]
+            if key.startswith("peak_"):
+                summary[f"max_{key}"] = max(values)
+            else:
+                summary[f"total_{key}"] = sum(values)
+            summary[f"median_{key}"] = statistics.median(values)
+    return summary
+
+
+def main():
+    usage = ("Usage: python bench.py generate directory people movies "
+             "[cast] [seed]\n"
+             "       python bench.py run directory [queries] [output]")
+    if len(sys.argv) < 3:
+        sys.exit(usage)
+    command, directory = sys.argv[1], sys.argv[2]
+
+    if command == "generate" and 5 <= len(sys.argv) <= 7:
+        numbers = [int(arg) for arg in sys.argv[3:]]
+        generate(directory, *numbers)
+        print(f"Wrote {numbers[0]} people and {numbers[1]} movies "
+              f"to {directory}")
+    elif command == "run" and len(sys.argv) <= 5:
+        num_queries = int(sys.argv[3]) if len(sys.argv) >= 4 else 20
+        report = benchmark(directory, num_queries)
+        if len(sys.argv) == 5:
+            with open(sys.argv[4], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        else:
+            summaries = {name: engine.get("summary", engine)
+                         for name, engine in report["engines"].items()}
+            print(json.dumps(summaries, indent=2))
+    else:
+        sys.exit(usage)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import load_graph
+from util import Node, StackFrontier, QueueFrontier, DequeQueueFrontier
 
 
 
@@ -60,19 +61,20 @@ def main():
     directory = sys.argv[1] if len(sys.argv) == 2 else "large"
     # directory = sys.argv[1] if len(sys.argv) == 2 else "small"
 
-    # Load data from files into memory
+    # Load the graph, memory-mapping its snapshot when it is current
+    # instead of parsing the CSVs again
     print("Loading data...")
-    load_data(directory)
+    graph = load_graph(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_for_name(graph, input("Name: "))
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_for_name(graph, input("Name: "))
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = graph.shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -81,9 +83,9 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person_names[path[i][1]]
+            person2 = graph.person_names[path[i + 1][1]]
+            movie = graph.movie_titles[path[i + 1][0]]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
@@ -98,7 +100,7 @@ def shortest_path(source, target):
 
     # Initialize frontier and starting position
     start           =       Node( state = source, parent = None, action = None)
-    frontier        =       QueueFrontier()
+    frontier        =       DequeQueueFrontier()
     frontier.add(start)
     
     # Initialize an empty explored set
@@ -124,8 +126,9 @@ def shortest_path(source, target):
                 child = Node( state = actor, parent = node, action = movie)
                 while True:
                     if child.parent == None:
+                        path.reverse()
                         return path
-                    path = [(child.action, child.state)] + path
+                    path.append((child.action, child.state))
                     child = child.parent
 
             if actor not in explored and not frontier.contains_state( actor ):
@@ -133,15 +136,94 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def shortest_path_bidirectional(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends.
+
+    Each step expands one whole BFS level of whichever frontier is smaller,
+    so the first person reached from both sides lies on a shortest path.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps a reached person to the (movie_id, person_id) step leading to it
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Always grow the smaller side
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _expand_level(
+                forward_frontier, forward, backward
+            )
+        else:
+            backward_frontier, meeting = _expand_level(
+                backward_frontier, backward, forward
+            )
+        if meeting is not None:
+            return _join_paths(meeting, forward, backward)
+
+    return None
+
+
+def _expand_level(frontier, parents, other_parents):
+    """
+    Expands every person on the frontier by one level, recording parents.
+
+    Returns the next frontier and the first person also reached by the
+    other side (or None if the two searches have not met yet).
+    """
+    next_frontier = []
+    for person_id in frontier:
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            if neighbor in other_parents:
+                return next_frontier, neighbor
+            next_frontier.append(neighbor)
+    return next_frontier, None
+
+
+def _join_paths(meeting, forward, backward):
+    """
+    Stitches the source half and the target half of a bidirectional search
+    together at the meeting person.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
 
-def person_id_for_name(name):
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    With interactive=False ambiguities are resolved without prompting,
+    in favour of whoever starred in the most movies.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and not interactive:
+        return max(sorted(person_ids),
+                   key=lambda person_id: len(people[person_id]["movies"]))
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -160,6 +242,29 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_for_name(graph, name):
+    """
+    Returns the person int in `graph` for a person's name,
+    asking which one was meant like person_id_for_name does.
+    """
+    people = graph.people_for_name(name)
+    if len(people) == 0:
+        return None
+    elif len(people) > 1:
+        print(f"Which '{name}'?")
+        for person in people:
+            person_id = graph.person_ids[person]
+            name = graph.person_names[person]
+            birth = graph.person_births[person]
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        person = graph.person_index.get(input("Intended Person ID: "))
+        if person in people:
+            return person
+        return None
+    else:
+        return people[0]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -1,7 +1,7 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from util import Node, StackFrontier, QueueFrontier, DequeQueueFrontier
 
 
 # Maps names to a set of corresponding person_ids
@@ -101,7 +101,7 @@ def shortest_path(source, target):
     start = Node( state = source, parent = None, action = None)
     # Initialize frontier to the starting position
     # frontier        =       StackFrontier()
-    frontier        =       QueueFrontier()
+    frontier        =       DequeQueueFrontier()
     for movie, actor in neighbors_for_person(source):
         if not actor == source:
         #     print(movie, actor)
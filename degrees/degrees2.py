@@ -1,7 +1,7 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from util import Node, StackFrontier, QueueFrontier, DequeQueueFrontier
 
 
 
@@ -98,7 +98,7 @@ def shortest_path(source, target):
 
     # Initialize frontier and starting position
     # start           =       Node( state = source, parent = None, action = None)
-    frontier        =       QueueFrontier()
+    frontier        =       DequeQueueFrontier()
     for movie, actor in neighbors_for_person(source):
         if actor != source:
             frontier.add(
@@ -0,0 +1,91 @@
+"""
+Single-source distance tables ("Bacon numbers").
+
+One level-synchronous BFS from a centre person gives the separation
+distance to everybody else, plus parent arrays from which any individual
+path is read back in O(path length).
+
+Usage: python distances.py [directory] name
+"""
+
+import sys
+from array import array
+
+from graph import INDEX, load_graph, path_from_tree
+
+
+class DistanceTable():
+    """
+    Distances and BFS parents from one source person to every person,
+    optionally only through the movies allowed by a filters mask.
+
+    `distance[p]` is the degrees of separation of person int p, or -1 if p
+    is not connected to the source.
+    """
+    def __init__(self, adjacency, source, movie_mask=None):
+        num_people = adjacency.num_people
+        self.source = source
+        self.distance = array(INDEX, [-1]) * num_people
+        self.parent_person = array(INDEX, [-1]) * num_people
+        self.parent_movie = array(INDEX, [-1]) * num_people
+        # counts[d] is the number of people at distance d
+        self.counts = []
+
+        distance = self.distance
+        levels = adjacency.bfs_levels(source, self.parent_person,
+                                      self.parent_movie, movie_mask)
+        for d, level in enumerate(levels):
+            for person in level:
+                distance[person] = d
+            self.counts.append(len(level))
+
+    def path(self, target):
+        """
+        Returns the shortest list of (movie, person) int pairs from the
+        source to `target`, or None if they are not connected.
+        """
+        return path_from_tree((self.parent_person, self.parent_movie), target)
+
+    def histogram(self):
+        """
+        Returns {distance: number of people at that distance}, with the
+        number of people not connected to the source under None.
+        """
+        histogram = dict(enumerate(self.counts))
+        histogram[None] = self.unreachable
+        return histogram
+
+    @property
+    def reachable(self):
+        return sum(self.counts)
+
+    @property
+    def unreachable(self):
+        return len(self.distance) - self.reachable
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python distances.py [directory] name")
+    directory = sys.argv[1] if len(sys.argv) == 3 else "large"
+    name = sys.argv[-1]
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+
+    people = graph.people_for_name(name)
+    if len(people) == 0:
+        sys.exit("Person not found.")
+    if len(people) > 1:
+        ids = ", ".join(graph.person_ids[person] for person in people)
+        sys.exit(f"Ambiguous name, matching ids: {ids}")
+
+    table = DistanceTable(graph, people[0])
+    for distance, count in enumerate(table.counts):
+        print(f"{distance}: {count}")
+    print(f"Not connected: {table.unreachable}")
+
+
+if __name__ == "__main__":
+    main()
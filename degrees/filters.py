@@ -0,0 +1,99 @@
+"""
+Movie filters for constrained separation queries.
+
+A filter is a small boolean expression over per-movie columns, e.g.
+
+    year >= 1990
+    1990 <= year <= 1999 and cast > 2
+    year > -1
+    not (year < 1980 or year > 2010)
+
+It compiles once into a mask holding one byte per movie (1 = usable).
+The BFS marks masked-out movies as already seen before it starts, so
+filtering adds no per-edge work.
+"""
+
+import ast
+from functools import lru_cache
+
+from graph import path_from_tree
+
+
+# Columns a filter may use, by name
+COLUMNS = ("year", "cast")
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not,
+    ast.USub, ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+    ast.Name, ast.Load, ast.Constant,
+)
+
+
+def parse_filter(expression):
+    """
+    Checks that `expression` only uses comparisons of COLUMNS with int
+    constants (optionally negated) joined by and / or / not, and returns
+    it as a function of the columns.
+
+    Raises ValueError for anything else, including expressions nested too
+    deeply to parse or compile.
+    """
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        raise ValueError(f"Invalid filter: {expression}")
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported filter syntax: {expression}")
+        if isinstance(node, ast.Name) and node.id not in COLUMNS:
+            raise ValueError(f"Unknown filter column: {node.id}")
+        if isinstance(node, ast.Constant) and type(node.value) is not int:
+            raise ValueError(f"Filter constants must be ints: {expression}")
+        if (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub)
+                and not isinstance(node.operand, ast.Constant)):
+            raise ValueError(f"Only constants can be negated: {expression}")
+    # Compile the checked tree itself, as the body of a lambda taking the
+    # columns, so nothing is parsed twice
+    arguments = ast.arguments(
+        posonlyargs=[], args=[ast.arg(arg=column) for column in COLUMNS],
+        kwonlyargs=[], kw_defaults=[], defaults=[]
+    )
+    function = ast.Expression(body=ast.Lambda(args=arguments,
+                                              body=tree.body))
+    try:
+        ast.fix_missing_locations(function)
+        code = compile(function, "<filter>", "eval")
+    except (RecursionError, MemoryError):
+        raise ValueError(f"Invalid filter: {expression}")
+    return eval(code, {"__builtins__": {}})
+
+
+@lru_cache(maxsize=64)
+def compile_filter(graph, expression):
+    """
+    Returns the movie mask for `expression` on `graph` as bytes, one byte
+    per movie int. Masks are cached per (graph, expression).
+    """
+    predicate = parse_filter(expression)
+    years = graph.year_column
+    offsets = graph.movie_offsets
+    return bytes(
+        1 if predicate(years[m], offsets[m + 1] - offsets[m]) else 0
+        for m in range(graph.num_movies)
+    )
+
+
+def shortest_path(graph, source, target, expression):
+    """
+    Returns the shortest list of (movie, person) int pairs that connect
+    the source to the target using only movies matching `expression`.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    if not graph.connected(source, target):
+        return None
+    mask = compile_filter(graph, expression)
+    tree = graph.search_tree(source, [target], movie_mask=mask)
+    return path_from_tree(tree, target)
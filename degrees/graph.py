@@ -0,0 +1,546 @@
+"""
+Compact, integer-indexed version of the degrees dataset.
+
+People and movies are interned to dense ints (their position in
+`person_ids` / `movie_ids`) and the bipartite star graph is kept as two
+CSR (compressed sparse row) adjacency structures built from flat arrays:
+
+    movies of person p:  person_movies[person_offsets[p]:person_offsets[p + 1]]
+    stars of movie m:    movie_people[movie_offsets[m]:movie_offsets[m + 1]]
+"""
+
+import csv
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+import snapshot
+from util import Node, DequeQueueFrontier
+
+
+# Typecode for every index / offset array (32-bit signed ints)
+INDEX = "i"
+
+# Flips a 0/1 movie mask into "already seen" flags for the BFS
+INVERT = bytes.maketrans(b"\x00\x01", b"\x01\x00")
+
+
+class Adjacency():
+    """
+    The CSR arrays on their own, with the searches that only need them.
+    Any buffer of ints works as an array (array.array, memoryview, ...).
+    """
+    def __init__(self, person_offsets, person_movies,
+                 movie_offsets, movie_people):
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1
+
+    def movies_for_person(self, person):
+        """
+        Yields the movie ints a person starred in.
+        """
+        person_movies = self.person_movies
+        for i in range(self.person_offsets[person],
+                       self.person_offsets[person + 1]):
+            yield person_movies[i]
+
+    def stars_for_movie(self, movie):
+        """
+        Yields the person ints starring in a movie.
+        """
+        movie_people = self.movie_people
+        for i in range(self.movie_offsets[movie],
+                       self.movie_offsets[movie + 1]):
+            yield movie_people[i]
+
+    def neighbors_for_person(self, person):
+        """
+        Yields (movie, person) int pairs for people who starred with a
+        given person, straight from the CSR arrays.
+
+        Like `degrees.neighbors_for_person`, the person is their own
+        neighbour through each of their movies.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) int pairs
+        that connect the source person to the target person.
+
+        Parents are recorded in two preallocated int arrays (the person
+        and the movie each person was reached through) instead of a Node
+        object per person, and the goal is tested on generation.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return []
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        parent_person = array(INDEX, [-1]) * self.num_people
+        parent_movie = array(INDEX, [-1]) * self.num_people
+        seen_movie = bytearray(self.num_movies)
+        parent_person[source] = source
+
+        frontier = deque([source])
+        while frontier:
+            person = frontier.popleft()
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if seen_movie[movie]:
+                    continue
+                seen_movie[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    costar = movie_people[j]
+                    if parent_person[costar] != -1:
+                        continue
+                    parent_person[costar] = person
+                    parent_movie[costar] = movie
+                    if costar == target:
+                        return path_from_tree((parent_person, parent_movie),
+                                              target)
+                    frontier.append(costar)
+
+        return None
+
+    def shortest_path_nodes(self, source, target):
+        """
+        Same search as `shortest_path`, keeping a util.Node per person in
+        a frontier instead of parent arrays.
+        """
+        if source == target:
+            return []
+
+        frontier = DequeQueueFrontier()
+        frontier.add(Node(state=source, parent=None, action=None))
+        explored = set()
+
+        while not frontier.empty():
+            node = frontier.remove()
+            explored.add(node.state)
+
+            for movie, person in self.neighbors_for_person(node.state):
+                if person in explored or frontier.contains_state(person):
+                    continue
+                child = Node(state=person, parent=node, action=movie)
+                if person == target:
+                    return path_to(child)
+                frontier.add(child)
+
+        return None
+
+    def search_tree(self, source, targets=None, movie_mask=None):
+        """
+        Runs a BFS from `source`, recording for every person reached the
+        person and movie they were first reached through.
+
+        With `targets`, stops as soon as all of them have been reached.
+        With `movie_mask`, only movies whose mask byte is 1 link people.
+        Returns a (parent_person, parent_movie) pair of arrays: unreached
+        people have parent -1 and the source is its own parent.
+        """
+        parent_person = array(INDEX, [-1]) * self.num_people
+        parent_movie = array(INDEX, [-1]) * self.num_people
+        remaining = None if targets is None else set(targets)
+
+        levels = self.bfs_levels(source, parent_person, parent_movie,
+                                 movie_mask)
+        for level in levels:
+            if remaining is not None:
+                remaining.difference_update(level)
+                if not remaining:
+                    break
+
+        return parent_person, parent_movie
+
+    def bfs_levels(self, source, parent_person, parent_movie,
+                   movie_mask=None):
+        """
+        Level-synchronous BFS from `source` that fills in the parent arrays
+        (which must start out as all -1) as people are reached, optionally
+        only through movies whose `movie_mask` byte is 1.
+
+        Yields the list of people first reached at each distance, starting
+        with [source] at distance 0.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        # A movie's cast only needs scanning the first time it is reached;
+        # masked-out movies start as seen, so they cost nothing per edge
+        if movie_mask is None:
+            seen_movie = bytearray(self.num_movies)
+        else:
+            seen_movie = bytearray(movie_mask.translate(INVERT))
+        parent_person[source] = source
+
+        frontier = [source]
+        while frontier:
+            yield frontier
+            next_frontier = []
+            for person in frontier:
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    if seen_movie[movie]:
+                        continue
+                    seen_movie[movie] = 1
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        costar = movie_people[j]
+                        if parent_person[costar] != -1:
+                            continue
+                        parent_person[costar] = person
+                        parent_movie[costar] = movie
+                        next_frontier.append(costar)
+            frontier = next_frontier
+
+
+    def label_components(self):
+        """
+        Labels every person with the id of their connected component.
+
+        Returns (component, sizes) arrays: component[p] is the component
+        id of person p and sizes[c] the number of people in component c.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        component = array(INDEX, [-1]) * self.num_people
+        sizes = array(INDEX)
+        seen_movie = bytearray(self.num_movies)
+
+        for start in range(self.num_people):
+            if component[start] != -1:
+                continue
+            label = len(sizes)
+            component[start] = label
+            size = 0
+            stack = [start]
+            while stack:
+                person = stack.pop()
+                size += 1
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    if seen_movie[movie]:
+                        continue
+                    seen_movie[movie] = 1
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        costar = movie_people[j]
+                        if component[costar] == -1:
+                            component[costar] = label
+                            stack.append(costar)
+            sizes.append(size)
+
+        return component, sizes
+
+
+class Graph(Adjacency):
+    """
+    Adjacency plus the per-person and per-movie columns of the dataset.
+    """
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 name_order=None, component=None, component_sizes=None,
+                 year_column=None):
+        # Per-person columns, indexed by person int
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+
+        # Per-movie columns, indexed by movie int
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+
+        # CSR adjacency in both directions
+        super().__init__(person_offsets, person_movies,
+                         movie_offsets, movie_people)
+
+        # IMDb id -> int
+        self.person_index = {pid: i for i, pid in enumerate(person_ids)}
+        self.movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+
+        # Person ints sorted by lowercase name, searched with bisect
+        if name_order is None:
+            name_order = array(INDEX, sorted(
+                range(len(person_names)),
+                key=lambda person: person_names[person].lower()
+            ))
+        self.name_order = name_order
+
+        # Connected component of every person, so that queries across
+        # components are answered without searching
+        if component is None:
+            component, component_sizes = self.label_components()
+        self.component = component
+        self.component_sizes = component_sizes
+
+        # Release year of every movie as an int (0 if unknown), for filters
+        if year_column is None:
+            year_column = array(INDEX, (to_int(year) for year in movie_years))
+        self.year_column = year_column
+
+        # Bumped whenever the graph is changed in place (ingest.apply_delta),
+        # so indexes built over it can tell they are out of date
+        self.generation = 0
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Build a graph from the people.csv, movies.csv and stars.csv files
+        in `directory`, the same files `degrees.load_data` reads.
+        """
+        person_ids, person_names, person_births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] in person_index:
+                    continue
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] in movie_index:
+                    continue
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        # Encode each (person, movie) edge as one int so duplicates in
+        # stars.csv collapse and sorting yields person-major order
+        num_movies = len(movie_ids)
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    person = person_index[row["person_id"]]
+                    movie = movie_index[row["movie_id"]]
+                except KeyError:
+                    continue
+                edges.add(person * num_movies + movie)
+
+        csr = build_csr(len(person_ids), num_movies, sorted(edges))
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years, *csr)
+
+    def shortest_path(self, source, target):
+        if not self.connected(source, target):
+            return None
+        return super().shortest_path(source, target)
+
+    def shortest_path_nodes(self, source, target):
+        if not self.connected(source, target):
+            return None
+        return super().shortest_path_nodes(source, target)
+
+    def connected(self, source, target):
+        """
+        Returns True if there is any path between the two people.
+        """
+        return self.component[source] == self.component[target]
+
+    def component_size(self, person):
+        """
+        Returns the number of people in the person's connected component.
+        """
+        return self.component_sizes[self.component[person]]
+
+    def people_for_name(self, name):
+        """
+        Returns the list of person ints whose name matches, ignoring case.
+        """
+        name = name.lower()
+        name_order = self.name_order
+        i = bisect_left(name_order, name, key=self.name_key)
+        people = []
+        while i < len(name_order) and self.name_key(name_order[i]) == name:
+            people.append(name_order[i])
+            i += 1
+        return people
+
+    def name_key(self, person):
+        return self.person_names[person].lower()
+
+    def to_ids(self, path):
+        """
+        Converts a path of (movie, person) ints into the
+        (movie_id, person_id) pairs used by degrees.py.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+# Snapshot sections holding each Graph column
+ARRAY_SECTIONS = ("person_offsets", "person_movies",
+                  "movie_offsets", "movie_people", "name_order",
+                  "component", "component_sizes", "year_column")
+STRING_SECTIONS = ("person_ids", "person_names", "person_births",
+                   "movie_ids", "movie_titles", "movie_years")
+
+
+def load_graph(directory, cache=True):
+    """
+    Loads the dataset in `directory` as a Graph.
+
+    With `cache`, a binary snapshot next to the CSV files is memory-mapped
+    when it is still current; otherwise the CSVs are parsed and a fresh
+    snapshot is written for the next run.
+    """
+    if cache:
+        sections = snapshot.read(directory)
+        if sections is not None and has_sections(*sections):
+            return graph_from_sections(*sections)
+
+    graph = Graph.from_csv(directory)
+    if cache:
+        try:
+            save_snapshot(graph, directory)
+        except OSError:
+            # A read-only dataset directory just means no cache
+            pass
+    return graph
+
+
+def graph_from_sections(arrays, strings):
+    """
+    Builds a Graph from the sections of a snapshot.
+    """
+    return Graph(*(strings[name] for name in STRING_SECTIONS),
+                 *(arrays[name] for name in ARRAY_SECTIONS))
+
+
+def has_sections(arrays, strings):
+    """
+    Returns True if a snapshot holds every column this version needs
+    (snapshots from older versions are rebuilt).
+    """
+    return (all(name in arrays for name in ARRAY_SECTIONS)
+            and all(name in strings for name in STRING_SECTIONS))
+
+
+def save_snapshot(graph, directory):
+    """
+    Writes `graph` to the snapshot file for `directory`.
+    """
+    snapshot.write(
+        directory,
+        {name: getattr(graph, name) for name in ARRAY_SECTIONS},
+        {name: getattr(graph, name) for name in STRING_SECTIONS}
+    )
+
+
+def build_csr(num_people, num_movies, edges):
+    """
+    Builds both CSR directions from edges encoded as
+    person * num_movies + movie and sorted ascending.
+
+    Returns (person_offsets, person_movies, movie_offsets, movie_people).
+    """
+    person_offsets = array(INDEX, [0]) * (num_people + 1)
+    person_movies = array(INDEX, [0]) * len(edges)
+    movie_offsets = array(INDEX, [0]) * (num_movies + 1)
+    movie_people = array(INDEX, [0]) * len(edges)
+
+    # Person side comes out of the sort already grouped
+    for i, edge in enumerate(edges):
+        person, movie = divmod(edge, num_movies)
+        person_offsets[person + 1] += 1
+        person_movies[i] = movie
+        movie_offsets[movie + 1] += 1
+    for p in range(num_people):
+        person_offsets[p + 1] += person_offsets[p]
+    for m in range(num_movies):
+        movie_offsets[m + 1] += movie_offsets[m]
+
+    # Movie side is scattered into place with a moving cursor per movie
+    cursor = array(INDEX, movie_offsets)
+    for edge in edges:
+        person, movie = divmod(edge, num_movies)
+        movie_people[cursor[movie]] = person
+        cursor[movie] += 1
+
+    return person_offsets, person_movies, movie_offsets, movie_people
+
+
+def to_int(value):
+    """
+    Parses an int column value, returning 0 for blanks and junk.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def path_from_tree(tree, target):
+    """
+    Returns the (movie, person) int pairs leading from the root of a
+    `search_tree` to `target`, or None if the search never reached it.
+    """
+    parent_person, parent_movie = tree
+    if parent_person[target] == -1:
+        return None
+    path = []
+    while parent_person[target] != target:
+        path.append((parent_movie[target], target))
+        target = parent_person[target]
+    path.reverse()
+    return path
+
+
+def reverse_path(source, path):
+    """
+    Turns a path from `source` to some target into the path from that
+    target back to `source` (the graph is undirected).
+    """
+    people = [source] + [person for _, person in path]
+    return [(movie, people[i])
+            for i, (movie, _) in reversed(list(enumerate(path)))]
+
+
+def path_to(node):
+    """
+    Walks parent links back from `node` and returns the
+    (action, state) pairs from the root's child down to `node`.
+    """
+    path = []
+    while node.parent is not None:
+        path.append((node.action, node.state))
+        node = node.parent
+    path.reverse()
+    return path
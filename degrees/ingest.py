@@ -0,0 +1,291 @@
+"""
+Incremental updates to a loaded degrees Graph.
+
+New people, movies and star rows are merged into the existing graph
+without re-reading the full CSVs: new ids get the next ints, the CSR
+arrays are re-spliced with the added edges, the name order is merged,
+and component labels are updated with a union-find over the components
+the new edges join.
+
+Deltas come either from a directory of delta CSVs (same headers as the
+dataset, any of the three files may be missing), or from rows appended to
+the dataset's own CSVs since its snapshot was written (`refresh`).
+
+Usage: python ingest.py directory [delta_directory]
+"""
+
+import csv
+import heapq
+import io
+import os
+import sys
+from array import array
+
+import filters
+import snapshot
+from graph import (INDEX, graph_from_sections, has_sections, load_graph,
+                   save_snapshot, to_int)
+
+
+def apply_delta(graph, people_rows=(), movie_rows=(), star_rows=(),
+                names=None):
+    """
+    Adds CSV-style rows (dicts keyed by the dataset's column names) to
+    `graph` in place. Rows for ids the graph already has are ignored, as
+    are star rows naming unknown ids or repeating an existing edge.
+
+    A names.NameIndex over the graph can be passed to keep it in sync.
+    Bumps graph.generation, so a landmarks.LandmarkIndex built before the
+    delta refuses to answer until it is rebuilt.
+    Returns a dict counting the people, movies and stars added.
+    """
+    old_people = graph.num_people
+
+    for row in people_rows:
+        if row["id"] in graph.person_index:
+            continue
+        graph.person_index[row["id"]] = len(graph.person_ids)
+        graph.person_ids.append(row["id"])
+        graph.person_names.append(row["name"])
+        graph.person_births.append(row["birth"])
+
+    new_years = []
+    for row in movie_rows:
+        if row["id"] in graph.movie_index:
+            continue
+        graph.movie_index[row["id"]] = len(graph.movie_ids)
+        graph.movie_ids.append(row["id"])
+        graph.movie_titles.append(row["title"])
+        graph.movie_years.append(row["year"])
+        new_years.append(to_int(row["year"]))
+
+    # New edges, grouped per person and per movie
+    person_additions = {}
+    movie_additions = {}
+    stars = 0
+    for row in star_rows:
+        person = graph.person_index.get(row["person_id"])
+        movie = graph.movie_index.get(row["movie_id"])
+        if person is None or movie is None:
+            continue
+        added = person_additions.setdefault(person, [])
+        if movie in added or (person < old_people
+                              and movie in graph.movies_for_person(person)):
+            continue
+        added.append(movie)
+        movie_additions.setdefault(movie, []).append(person)
+        stars += 1
+
+    num_people = len(graph.person_ids)
+    num_movies = len(graph.movie_ids)
+    graph.person_offsets, graph.person_movies = merge_csr(
+        graph.person_offsets, graph.person_movies, person_additions,
+        num_people
+    )
+    graph.movie_offsets, graph.movie_people = merge_csr(
+        graph.movie_offsets, graph.movie_people, movie_additions, num_movies
+    )
+
+    graph.year_column = copy_array(graph.year_column)
+    graph.year_column.extend(new_years)
+
+    new_people = range(old_people, num_people)
+    graph.name_order = array(INDEX, heapq.merge(
+        graph.name_order,
+        sorted(new_people, key=graph.name_key),
+        key=graph.name_key
+    ))
+    update_components(graph, old_people, movie_additions)
+
+    if names is not None:
+        for person in new_people:
+            names.add(person)
+    # Cached masks were built for the old number of movies, and landmark
+    # distances for the old edges
+    filters.compile_filter.cache_clear()
+    graph.generation += 1
+
+    return {"people": len(new_people), "movies": len(new_years),
+            "stars": stars}
+
+
+def apply_delta_directory(graph, delta_directory, names=None):
+    """
+    Applies the people.csv, movies.csv and stars.csv found in
+    `delta_directory` to `graph`.
+    """
+    rows = []
+    for name in snapshot.SOURCES:
+        path = os.path.join(delta_directory, name)
+        if not os.path.exists(path):
+            rows.append([])
+            continue
+        with open(path, encoding="utf-8") as f:
+            rows.append(list(csv.DictReader(f)))
+    return apply_delta(graph, *rows, names=names)
+
+
+def refresh(directory):
+    """
+    Loads the dataset in `directory`, reusing its snapshot even if rows
+    were appended to the CSVs since it was written: only the appended
+    rows are parsed and merged, and the snapshot is rewritten.
+
+    Falls back to graph.load_graph when the CSVs changed in any other way.
+    """
+    opened = snapshot.read_any(directory)
+    if opened is None:
+        return load_graph(directory)
+    sources, arrays, strings = opened
+    if not has_sections(arrays, strings):
+        return load_graph(directory)
+
+    tails = []
+    for source in sources:
+        if len(source) != 4:
+            # Written before digests were recorded
+            return load_graph(directory)
+        name, size, mtime, checksum = source
+        path = os.path.join(directory, name)
+        try:
+            tail = appended_rows(path, size, mtime, checksum)
+        except OSError:
+            return load_graph(directory)
+        if tail is None:
+            return load_graph(directory)
+        tails.append(tail)
+
+    graph = graph_from_sections(arrays, strings)
+    if any(tails):
+        apply_delta(graph, *tails)
+        try:
+            save_snapshot(graph, directory)
+        except OSError:
+            # A read-only dataset directory just means no cache
+            pass
+    return graph
+
+
+def appended_rows(path, size, mtime, checksum):
+    """
+    Returns the rows appended to the CSV at `path` since it was `size`
+    bytes long with modification time `mtime` and snapshot.digest
+    `checksum`, or None if the file was changed other than by appending
+    whole lines.
+    """
+    stat = os.stat(path)
+    if stat.st_size == size:
+        return [] if stat.st_mtime_ns == mtime else None
+    if stat.st_size < size:
+        return None
+    # Rows rewritten in place before the old end would otherwise go unseen
+    if snapshot.digest(path, size) != checksum:
+        return None
+    with open(path, "rb") as f:
+        header = f.readline()
+        if size < len(header):
+            return None
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            return None
+        tail = f.read().decode("utf-8")
+    fields = next(csv.reader([header.decode("utf-8")]))
+    return list(csv.DictReader(io.StringIO(tail), fieldnames=fields))
+
+
+def merge_csr(offsets, values, additions, num_rows):
+    """
+    Returns new (offsets, values) arrays with `additions` ({row: [values]})
+    appended to their rows. Rows past the end of `offsets` are new and
+    start out empty. Unchanged runs are block-copied.
+    """
+    old_rows = len(offsets) - 1
+    width = memoryview(values).itemsize
+    old_bytes = memoryview(values).cast("B")
+    new_values = array(INDEX)
+    copied = 0
+    for row in sorted(additions):
+        end = offsets[min(row + 1, old_rows)]
+        new_values.frombytes(old_bytes[copied * width:end * width])
+        new_values.extend(additions[row])
+        copied = end
+    new_values.frombytes(old_bytes[copied * width:])
+
+    new_offsets = array(INDEX, [0]) * (num_rows + 1)
+    shift = 0
+    last = offsets[old_rows]
+    for row in range(num_rows):
+        shift += len(additions.get(row, ()))
+        new_offsets[row + 1] = (offsets[row + 1] if row < old_rows
+                                else last) + shift
+    return new_offsets, new_values
+
+
+def update_components(graph, old_people, movie_additions):
+    """
+    Extends the component labels to new people and merges the
+    components joined by new edges.
+    """
+    component = copy_array(graph.component)
+    sizes = copy_array(graph.component_sizes)
+    for person in range(old_people, graph.num_people):
+        component.append(len(sizes))
+        sizes.append(1)
+
+    # Union-find over component labels
+    parent = {}
+
+    def find(label):
+        root = label
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while label != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    for movie in movie_additions:
+        cast = graph.stars_for_movie(movie)
+        root = find(component[next(cast)])
+        for person in cast:
+            other = find(component[person])
+            if other != root:
+                parent[other] = root
+                sizes[root] += sizes[other]
+                sizes[other] = 0
+
+    if parent:
+        for person in range(graph.num_people):
+            if component[person] in parent:
+                component[person] = find(component[person])
+
+    graph.component = component
+    graph.component_sizes = sizes
+
+
+def copy_array(values):
+    """
+    Returns a writable array.array copy of an int array or memoryview.
+    """
+    copy = array(INDEX)
+    copy.frombytes(memoryview(values).cast("B"))
+    return copy
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python ingest.py directory [delta_directory]")
+    directory = sys.argv[1]
+
+    if len(sys.argv) == 2:
+        graph = refresh(directory)
+        print(f"{graph.num_people} people, {graph.num_movies} movies.")
+        return
+
+    graph = load_graph(directory)
+    added = apply_delta_directory(graph, sys.argv[2])
+    print(f"Added {added['people']} people, {added['movies']} movies "
+          f"and {added['stars']} stars.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Landmark distance oracle (ALT) for degrees queries.
+
+K well-connected people are chosen as landmarks and their BFS distance to
+every person is stored. For any landmark L the triangle inequality gives
+
+    |d(L, s) - d(L, t)|  <=  d(s, t)  <=  d(L, s) + d(L, t)
+
+which answers "estimate only" queries instantly and, as a lower bound,
+is an admissible (and consistent) heuristic for A*.
+
+The index is built offline and kept in its own snapshot file next to the
+dataset:
+
+Usage: python landmarks.py [directory] [k]
+"""
+
+import heapq
+import sys
+from array import array
+
+import snapshot
+from distances import DistanceTable
+from graph import INDEX, load_graph
+
+
+FILENAME = "landmarks.snapshot"
+
+# Distances are stored one byte each; this marks "not connected"
+UNREACHED = 255
+
+
+class LandmarkIndex():
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        # Graph.generation the distances were computed for
+        self.generation = graph.generation
+        # Person int of each landmark
+        self.landmarks = landmarks
+        # distances[k * num_people + p] is the distance from landmark k to p
+        self.distances = distances
+        view = memoryview(distances)
+        n = graph.num_people
+        self.rows = [view[k * n:(k + 1) * n] for k in range(len(landmarks))]
+
+    @classmethod
+    def build(cls, graph, k=16):
+        """
+        Picks the k people with the most co-star links as landmarks and
+        runs one BFS from each.
+        """
+        landmarks = array(INDEX, pick_landmarks(graph, k))
+        distances = array("B")
+        for landmark in landmarks:
+            table = DistanceTable(graph, landmark)
+            if len(table.counts) > UNREACHED:
+                raise ValueError("Distances too large for the landmark index.")
+            distances.extend(UNREACHED if d == -1 else d
+                             for d in table.distance)
+        return cls(graph, landmarks, distances)
+
+    @classmethod
+    def load(cls, graph, directory):
+        """
+        Returns the index saved for `directory`, or None if there is none
+        or the dataset changed since it was built.
+        """
+        sections = snapshot.read(directory, FILENAME)
+        if sections is None:
+            return None
+        arrays, _ = sections
+        if "landmarks" not in arrays or "distances" not in arrays:
+            return None
+        expected = len(arrays["landmarks"]) * graph.num_people
+        if len(arrays["distances"]) != expected:
+            return None
+        return cls(graph, arrays["landmarks"], arrays["distances"])
+
+    def save(self, directory):
+        snapshot.write(directory, {"landmarks": self.landmarks,
+                                   "distances": self.distances},
+                       {}, FILENAME)
+
+    @property
+    def stale(self):
+        """
+        True once the graph has changed since the distances were computed.
+        """
+        return self.generation != self.graph.generation
+
+    def check(self):
+        """
+        Raises ValueError if the index is stale: its bounds could be wrong,
+        so it must be rebuilt before use.
+        """
+        if self.stale:
+            raise ValueError("Landmark index is out of date; rebuild it.")
+
+    def estimate(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two people without searching, or None if they are not connected.
+
+        upper is None when no landmark lies in their component.
+        Raises ValueError if the graph changed since the index was built.
+        """
+        self.check()
+        if not self.graph.connected(source, target):
+            return None
+        lower, upper = 0, None
+        for row in self.rows:
+            ds, dt = row[source], row[target]
+            if ds == UNREACHED or dt == UNREACHED:
+                continue
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) int pairs from source
+        to target, found by A* guided by the landmark lower bounds.
+
+        If no possible path, returns None.
+        Raises ValueError if the graph changed since the index was built.
+        """
+        self.check()
+        graph = self.graph
+        if source == target:
+            return []
+        if not graph.connected(source, target):
+            return None
+
+        # Only landmarks in the target's component say anything; every
+        # person A* reaches is in that same component
+        bounds = [(row, row[target]) for row in self.rows
+                  if row[target] != UNREACHED]
+
+        def heuristic(person):
+            h = 0
+            for row, dt in bounds:
+                d = row[person] - dt
+                if d > h:
+                    h = d
+                elif -d > h:
+                    h = -d
+            return h
+
+        cost = {source: 0}
+        parents = {source: None}
+        closed = set()
+        # Ties on f go to the deeper node, which reaches the target sooner
+        heap = [(heuristic(source), 0, source)]
+
+        while heap:
+            _, g, person = heapq.heappop(heap)
+            if person == target:
+                break
+            if person in closed:
+                continue
+            closed.add(person)
+            g = -g + 1
+            for movie, costar in graph.neighbors_for_person(person):
+                if costar in closed or cost.get(costar, g + 1) <= g:
+                    continue
+                cost[costar] = g
+                parents[costar] = (movie, person)
+                heapq.heappush(heap, (g + heuristic(costar), -g, costar))
+        else:
+            return None
+
+        path = []
+        while parents[target] is not None:
+            movie, person = parents[target]
+            path.append((movie, target))
+            target = person
+        path.reverse()
+        return path
+
+
+def pick_landmarks(graph, k):
+    """
+    Returns the k people with the most co-star links (summed cast sizes
+    of their movies), best first.
+    """
+    movie_offsets = graph.movie_offsets
+    cast_sizes = [movie_offsets[m + 1] - movie_offsets[m]
+                  for m in range(graph.num_movies)]
+    links = [sum(cast_sizes[movie] for movie in graph.movies_for_person(p))
+             for p in range(graph.num_people)]
+    return heapq.nlargest(k, range(graph.num_people), key=links.__getitem__)
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [k]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+
+    print(f"Building {k} landmarks...")
+    index = LandmarkIndex.build(graph, k)
+    index.save(directory)
+    print(f"Saved to {snapshot.path_for(directory, FILENAME)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Non-interactive name resolution for the degrees graph.
+
+Exact and prefix lookups bisect the graph's name_order (person ints sorted
+by lowercase name). Fuzzy lookups go through a trigram index. When a name
+matches several people, `resolve` picks one by policy instead of asking
+on stdin like degrees.person_id_for_name does.
+"""
+
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from graph import INDEX
+
+
+# Disambiguation policies for NameIndex.resolve
+MOST_MOVIES = "most_movies"
+FIRST = "first"
+
+# Fuzzy matches scoring below this (trigram Jaccard) are ignored
+MIN_SIMILARITY = 0.3
+
+# Postings a fuzzy lookup counts, rarest trigrams first; the query's more
+# common trigrams only enter the final scoring
+MAX_POSTINGS = 20000
+
+# People the final scoring looks at per fuzzy lookup
+MAX_CANDIDATES = 500
+
+
+class NameIndex():
+    def __init__(self, graph):
+        self.graph = graph
+        # Trigram -> array of person ints whose name contains it (once
+        # each)
+        postings = {}
+        for person, name in enumerate(graph.person_names):
+            for trigram in trigrams(name):
+                postings.setdefault(trigram, []).append(person)
+        self.postings = {trigram: array(INDEX, people)
+                         for trigram, people in postings.items()}
+
+    def add(self, person):
+        """
+        Indexes a person appended to the graph after the index was built.
+        """
+        for trigram in trigrams(self.graph.person_names[person]):
+            self.postings.setdefault(trigram, array(INDEX)).append(person)
+
+    def exact(self, name):
+        """
+        Returns the person ints named `name`, ignoring case.
+        """
+        return self.graph.people_for_name(name)
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns person ints whose name starts with `prefix` (ignoring
+        case), in name order, at most `limit` of them.
+        """
+        graph = self.graph
+        prefix = prefix.lower()
+        order = graph.name_order
+        i = bisect_left(order, prefix, key=graph.name_key)
+        people = []
+        while i < len(order) and (limit is None or len(people) < limit):
+            if not graph.name_key(order[i]).startswith(prefix):
+                break
+            people.append(order[i])
+            i += 1
+        return people
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to `limit` (person, similarity) pairs for the names most
+        similar to `name`, best first. Similarity is the Jaccard index of
+        the two trigram multisets, so "Person 999" and "Person 9999" differ;
+        equal scores go to the smaller edit distance.
+
+        Candidates are gathered from the postings of the query's rarest
+        trigrams, up to MAX_POSTINGS of them, so a trigram most names share
+        costs nothing.
+        """
+        query = trigrams(name)
+        if not query:
+            return []
+        postings = self.postings
+        shared = Counter()
+        counted = 0
+        for trigram in sorted(query, key=lambda t: len(postings.get(t, ()))):
+            people = postings.get(trigram, ())
+            if shared and counted + len(people) > MAX_POSTINGS:
+                break
+            shared.update(people)
+            counted += len(people)
+
+        # Everyone tied with the last of the best limit * 5 is kept, so the
+        # cut does not depend on person order
+        best = shared.most_common(limit * 5)
+        if not best:
+            return []
+        floor = best[-1][1]
+        pool = sorted((person for person, common in shared.items()
+                       if common >= floor),
+                      key=lambda person: (-shared[person], person))
+
+        size = sum(query.values())
+        scored = []
+        for person in pool[:MAX_CANDIDATES]:
+            grams = trigrams(self.graph.person_names[person])
+            common = sum((query & grams).values())
+            similarity = common / (size + sum(grams.values()) - common)
+            if similarity >= MIN_SIMILARITY:
+                scored.append((similarity, person))
+        scored.sort(key=lambda pair: -pair[0])
+
+        # Edit distance only for the results and whoever ties the last one
+        end = limit
+        while 0 < end < len(scored) and scored[end][0] == scored[end - 1][0]:
+            end += 1
+        typed = normalize(name)
+        scored = sorted(scored[:end], key=lambda pair: (
+            -pair[0],
+            edit_distance(typed, normalize(self.graph.person_names[pair[1]])),
+            pair[1],
+        ))
+        return [(person, similarity) for similarity, person in scored[:limit]]
+
+    def candidates(self, name, birth=None):
+        """
+        Returns the people a typed name most plausibly refers to: the exact
+        matches, or failing that the closest fuzzy matches, narrowed to a
+        birth year if one is given and any candidate has it.
+        """
+        people = self.exact(name)
+        if not people:
+            matches = self.fuzzy(name)
+            if matches:
+                best = matches[0][1]
+                people = [person for person, similarity in matches
+                          if similarity == best]
+        if birth is not None:
+            born = [person for person in people
+                    if self.graph.person_births[person] == str(birth)]
+            if born:
+                people = born
+        return people
+
+    def resolve(self, name, birth=None, policy=MOST_MOVIES):
+        """
+        Returns the single person int for a typed name, or None if nothing
+        matches. Ties are broken by `policy`: MOST_MOVIES prefers whoever
+        starred in most movies, FIRST takes the lowest person int.
+        """
+        people = self.candidates(name, birth)
+        if not people:
+            return None
+        if policy == MOST_MOVIES:
+            offsets = self.graph.person_offsets
+            return max(people, key=lambda person: (
+                offsets[person + 1] - offsets[person], -person
+            ))
+        if policy == FIRST:
+            return min(people)
+        raise ValueError(f"Unknown policy: {policy}")
+
+
+def normalize(name):
+    """
+    Lowercases a name, strips accents and collapses whitespace.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+def trigrams(name):
+    """
+    Returns the 3-character substrings of the padded, normalized name as a
+    Counter, since a repeated trigram counts once per occurrence.
+    """
+    padded = f"  {normalize(name)} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def edit_distance(a, b):
+    """
+    Returns the Levenshtein distance between two strings.
+    """
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
@@ -0,0 +1,216 @@
+"""
+All shortest paths and k-shortest paths between two people.
+
+A BFS from the source, stopped once the target's level is complete, leaves
+a DAG of every shortest path: a person v at distance d + 1 is reached
+through each movie first seen at level d that has v in its cast, and from
+every cast member of that movie at distance d. Counting paths is a sum
+over that DAG, so it never enumerates them.
+"""
+
+import heapq
+from array import array
+from itertools import count, islice
+
+from graph import INDEX
+
+
+class ShortestPathDAG():
+    def __init__(self, adjacency, source, target):
+        """
+        Runs the BFS from `source` until every shortest path to `target`
+        is known.
+        """
+        self.adjacency = adjacency
+        self.source = source
+        self.target = target
+
+        person_offsets = adjacency.person_offsets
+        person_movies = adjacency.person_movies
+        movie_offsets = adjacency.movie_offsets
+        movie_people = adjacency.movie_people
+
+        # BFS level of each person, and of each movie (the level of the
+        # first cast member that reached it)
+        distance = array(INDEX, [-1]) * adjacency.num_people
+        movie_level = array(INDEX, [-1]) * adjacency.num_movies
+        self.distance = distance
+        self.movie_level = movie_level
+        # Number of shortest paths from the source to each person reached
+        paths = {source: 1}
+
+        distance[source] = 0
+        level = 0
+        frontier = [source]
+        while frontier and distance[target] == -1:
+            movies = []
+            through = {}
+            for person in frontier:
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    if movie_level[movie] == -1:
+                        movie_level[movie] = level
+                        movies.append(movie)
+                        through[movie] = 0
+                    if movie_level[movie] == level:
+                        through[movie] += paths[person]
+
+            next_frontier = []
+            for movie in movies:
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    costar = movie_people[j]
+                    if distance[costar] == -1:
+                        distance[costar] = level + 1
+                        paths[costar] = 0
+                        next_frontier.append(costar)
+                    if distance[costar] == level + 1:
+                        paths[costar] += through[movie]
+
+            frontier = next_frontier
+            level += 1
+
+        self.paths = paths
+
+    @property
+    def length(self):
+        """
+        Degrees of separation, or None if the two are not connected.
+        """
+        d = self.distance[self.target]
+        return None if d == -1 else d
+
+    def count(self):
+        """
+        Returns how many distinct shortest paths there are (0 if none).
+        """
+        return self.paths.get(self.target, 0)
+
+    def predecessors(self, person):
+        """
+        Yields the (movie, person) steps one level closer to the source
+        that lead to `person` along a shortest path.
+        """
+        adjacency = self.adjacency
+        level = self.distance[person] - 1
+        for movie in adjacency.movies_for_person(person):
+            if self.movie_level[movie] != level:
+                continue
+            for costar in adjacency.stars_for_movie(movie):
+                if self.distance[costar] == level:
+                    yield movie, costar
+
+    def iter_paths(self, limit=None):
+        """
+        Lazily yields every shortest path as a list of (movie, person)
+        pairs, stopping after `limit` paths if given.
+        """
+        if self.length is None:
+            return iter(())
+        return islice(self._walk_back(self.target, []), limit)
+
+    def _walk_back(self, person, suffix):
+        if person == self.source:
+            yield suffix[::-1]
+            return
+        for movie, previous in self.predecessors(person):
+            suffix.append((movie, person))
+            yield from self._walk_back(previous, suffix)
+            suffix.pop()
+
+
+def count_shortest_paths(adjacency, source, target):
+    """
+    Returns the number of distinct shortest paths between two people.
+    """
+    if source == target:
+        return 1
+    return ShortestPathDAG(adjacency, source, target).count()
+
+
+def all_shortest_paths(adjacency, source, target, limit=None):
+    """
+    Yields every shortest list of (movie, person) pairs from source to
+    target, at most `limit` of them if given.
+    """
+    if source == target:
+        yield []
+        return
+    yield from ShortestPathDAG(adjacency, source, target).iter_paths(limit)
+
+
+def k_shortest_paths(adjacency, source, target, k):
+    """
+    Yields up to k loopless paths from source to target in order of
+    length, shortest first (Yen's algorithm).
+    """
+    if source == target:
+        yield []
+        return
+    first = restricted_path(adjacency, source, target, set(), set())
+    if first is None:
+        return
+
+    found = [first]
+    seen = {tuple(first)}
+    candidates = []
+    tie = count()
+    yield first
+
+    while len(found) < k:
+        previous = found[-1]
+        people = [source] + [person for _, person in previous]
+        for i in range(len(previous)):
+            spur = people[i]
+            root = previous[:i]
+            # Steps already used from this root must not be taken again
+            blocked_steps = {path[i] for path in found
+                             if len(path) > i and path[:i] == root}
+            spur_path = restricted_path(adjacency, spur, target,
+                                        set(people[:i]), blocked_steps)
+            if spur_path is None:
+                continue
+            candidate = root + spur_path
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (len(candidate), next(tie),
+                                            candidate))
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        found.append(path)
+        yield path
+
+
+def restricted_path(adjacency, source, target, blocked_people, blocked_steps):
+    """
+    BFS for the shortest list of (movie, person) pairs from source to
+    target that avoids `blocked_people` and does not leave the source by
+    any (movie, person) step in `blocked_steps`.
+
+    If no such path, returns None.
+    """
+    parents = {source: None}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person in frontier:
+            for step in adjacency.neighbors_for_person(person):
+                movie, costar = step
+                if costar in parents or costar in blocked_people:
+                    continue
+                if person == source and step in blocked_steps:
+                    continue
+                parents[costar] = (movie, person)
+                if costar == target:
+                    path = []
+                    while parents[costar] is not None:
+                        movie, previous = parents[costar]
+                        path.append((movie, costar))
+                        costar = previous
+                    path.reverse()
+                    return path
+                next_frontier.append(costar)
+        frontier = next_frontier
+    return None
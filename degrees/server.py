@@ -0,0 +1,271 @@
+"""
+Long-lived HTTP server answering degrees of separation queries.
+
+The graph is loaded once (through the snapshot cache) and every request is
+answered with JSON:
+
+    GET /path?source=Kevin Bacon&target=Tom Hanks
+    GET /path?source_id=102&target_id=158
+    GET /path?source=Kevin Bacon&target=Tom Hanks&filter=year >= 1990
+    GET /metrics
+
+Usage: python server.py [directory] [port]
+"""
+
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import filters
+from graph import load_graph
+
+
+class LRUCache():
+    """
+    Least-recently-used mapping from (source, target) to a path.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class QueryError(Exception):
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class DegreesService():
+    """
+    Answers path queries against one loaded Graph, caching recent paths
+    and keeping latency metrics. Safe to share between request threads.
+    """
+    def __init__(self, graph, cache_size=10000, window=1000):
+        self.graph = graph
+        self.cache = LRUCache(cache_size)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        # Latencies (seconds) of the most recent requests
+        self.latencies = deque(maxlen=window)
+
+    def query(self, params):
+        """
+        Answers one query given its parameters (source/target names or
+        source_id/target_id IMDb ids, plus an optional movie filter) and
+        returns a JSON-ready dict. Failed queries, whatever the exception,
+        are recorded as errors.
+        """
+        start = time.perf_counter()
+        try:
+            source = self.resolve(params, "source")
+            target = self.resolve(params, "target")
+            expression = params.get("filter")
+            key = (source, target, expression)
+            with self.lock:
+                try:
+                    path = self.cache.get(key)
+                    cached = True
+                except KeyError:
+                    cached = False
+            if not cached:
+                path = self.search(source, target, expression)
+                with self.lock:
+                    self.cache.put(key, path)
+            response = self.describe(source, target, path)
+            response["cached"] = cached
+        except Exception:
+            self.record(time.perf_counter() - start, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+        self.record(elapsed)
+        response["elapsed_ms"] = round(elapsed * 1000, 3)
+        return response
+
+    def search(self, source, target, expression):
+        if expression is None:
+            return self.graph.shortest_path(source, target)
+        try:
+            return filters.shortest_path(self.graph, source, target,
+                                         expression)
+        except ValueError as e:
+            raise QueryError(400, str(e))
+
+    def resolve(self, params, role):
+        """
+        Returns the person int named by `role` in the query parameters.
+        """
+        graph = self.graph
+        if f"{role}_id" in params:
+            person_id = params[f"{role}_id"]
+            if person_id not in graph.person_index:
+                raise QueryError(404, f"Unknown {role}_id.", id=person_id)
+            return graph.person_index[person_id]
+        if role not in params:
+            raise QueryError(400, f"Missing {role} or {role}_id.")
+
+        people = graph.people_for_name(params[role])
+        if len(people) == 0:
+            raise QueryError(404, f"Person not found: {params[role]}.")
+        if len(people) > 1:
+            raise QueryError(
+                409, f"Ambiguous {role}; pass {role}_id instead.",
+                candidates=[self.person(p) for p in people]
+            )
+        return people[0]
+
+    def describe(self, source, target, path):
+        graph = self.graph
+        response = {"source": self.person(source),
+                    "target": self.person(target)}
+        if path is None:
+            response["degrees"] = None
+            response["path"] = None
+            return response
+        response["degrees"] = len(path)
+        response["path"] = [
+            {"movie_id": graph.movie_ids[movie],
+             "title": graph.movie_titles[movie],
+             "person_id": graph.person_ids[person],
+             "name": graph.person_names[person]}
+            for movie, person in path
+        ]
+        return response
+
+    def person(self, person):
+        graph = self.graph
+        return {"id": graph.person_ids[person],
+                "name": graph.person_names[person],
+                "birth": graph.person_births[person]}
+
+    def record(self, elapsed, error=False):
+        with self.lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+            self.latencies.append(elapsed)
+
+    def metrics(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            metrics = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "cache_size": len(self.cache),
+                "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses,
+            }
+        if latencies:
+            metrics["latency_ms"] = {
+                "mean": round(1000 * sum(latencies) / len(latencies), 3),
+                "p50": round(1000 * percentile(latencies, 50), 3),
+                "p95": round(1000 * percentile(latencies, 95), 3),
+                "p99": round(1000 * percentile(latencies, 99), 3),
+                "max": round(1000 * latencies[-1], 3),
+            }
+        return metrics
+
+
+def percentile(ordered, p):
+    """
+    Returns the p-th percentile (nearest rank) of an ascending list.
+    """
+    rank = max(0, -(-p * len(ordered) // 100) - 1)
+    return ordered[rank]
+
+
+class DegreesHandler(BaseHTTPRequestHandler):
+    # Set on the class by make_server
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1]
+                  for key, values in parse_qs(url.query).items()}
+        if url.path == "/path":
+            try:
+                response = self.service.query(params)
+            except QueryError as e:
+                self.send_json(e.status, {"error": str(e), **e.details})
+            except Exception:
+                # A bug, not a bad query: answer anyway and keep serving
+                traceback.print_exc()
+                self.send_json(500, {"error": "Internal server error."})
+            else:
+                self.send_json(200, response)
+        elif url.path == "/metrics":
+            self.send_json(200, self.service.metrics())
+        else:
+            self.send_json(404, {"error": "Not found."})
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Per-request latencies are in /metrics; keep stderr quiet
+        pass
+
+
+def make_server(graph, host="127.0.0.1", port=8000, cache_size=10000):
+    """
+    Returns an HTTP server (not yet serving) bound to host:port.
+    """
+    handler = type("Handler", (DegreesHandler,),
+                   {"service": DegreesService(graph, cache_size)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python server.py [directory] [port]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    port = int(sys.argv[2]) if len(sys.argv) == 3 else 8000
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+
+    server = make_server(graph, port=port)
+    print(f"Serving on http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
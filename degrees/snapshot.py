@@ -0,0 +1,181 @@
+"""
+Binary snapshot files for the degrees dataset.
+
+A snapshot is written next to the CSV files it was built from and holds
+named int arrays plus named string columns:
+
+    magic | header length | JSON header | 8-byte aligned sections...
+
+The header records the size and mtime of every source CSV, so a snapshot
+is ignored as soon as any of them changes, plus a digest of its contents
+so ingest.refresh can check that a grown CSV was only appended to. Int
+arrays are returned as memoryviews over a read-only memory map, so
+opening a snapshot does not copy the adjacency data.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+
+MAGIC = b"DEGSNAP1"
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Separates entries inside a string column
+SEPARATOR = "\0"
+
+# Bytes hashed at a time by `digest`
+CHUNK = 1 << 20
+
+
+def path_for(directory, filename=FILENAME):
+    """
+    Returns the snapshot path for a dataset directory.
+    """
+    return os.path.join(directory, filename)
+
+
+def fingerprint(directory):
+    """
+    Returns the [name, size, mtime_ns] of every source CSV in `directory`.
+    """
+    result = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        result.append([name, stat.st_size, stat.st_mtime_ns])
+    return result
+
+
+def digest(path, size):
+    """
+    Returns the hex BLAKE2b digest of the first `size` bytes of the file at
+    `path`, or None if it is shorter than that.
+    """
+    hashed = hashlib.blake2b()
+    with open(path, "rb") as f:
+        while size > 0:
+            chunk = f.read(min(size, CHUNK))
+            if not chunk:
+                return None
+            hashed.update(chunk)
+            size -= len(chunk)
+    return hashed.hexdigest()
+
+
+def write(directory, arrays, strings, filename=FILENAME):
+    """
+    Writes a snapshot for `directory`.
+
+    `arrays` maps section names to int arrays (anything exposing the buffer
+    protocol, such as array.array or memoryview) and `strings` maps section
+    names to lists of str. Other indexes over the same dataset are kept in
+    their own file by passing a different `filename`.
+    """
+    sources = fingerprint(directory)
+    for source in sources:
+        name, size = source[:2]
+        source.append(digest(os.path.join(directory, name), size))
+    header = {
+        "byteorder": sys.byteorder,
+        "sources": sources,
+        "arrays": {},
+        "strings": {},
+    }
+    blobs = []
+    offset = 0
+    for name, values in arrays.items():
+        view = memoryview(values)
+        header["arrays"][name] = [offset, view.nbytes, view.format]
+        blobs.append(view.cast("B"))
+        offset = _aligned(offset + view.nbytes)
+    for name, values in strings.items():
+        blob = SEPARATOR.join(values).encode("utf-8")
+        header["strings"][name] = [offset, len(blob), len(values)]
+        blobs.append(blob)
+        offset = _aligned(offset + len(blob))
+
+    encoded = json.dumps(header).encode("utf-8")
+    start = _aligned(len(MAGIC) + 8 + len(encoded))
+
+    path = path_for(directory, filename)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        f.write(bytes(start - f.tell()))
+        for blob in blobs:
+            f.write(blob)
+            f.write(bytes(_aligned(f.tell()) - f.tell()))
+    os.replace(tmp, path)
+
+
+def read(directory, filename=FILENAME):
+    """
+    Opens the snapshot for `directory`.
+
+    Returns (arrays, strings) as dicts keyed by section name, or None if
+    there is no snapshot or it is stale.
+    """
+    opened = read_any(directory, filename)
+    if opened is None:
+        return None
+    sources, arrays, strings = opened
+    try:
+        if [source[:3] for source in sources] != fingerprint(directory):
+            return None
+    except OSError:
+        return None
+    return arrays, strings
+
+
+def read_any(directory, filename=FILENAME):
+    """
+    Opens the snapshot for `directory` even if it is stale.
+
+    Returns (sources, arrays, strings), where sources is the fingerprint
+    the snapshot was built from with each CSV's digest appended
+    ([name, size, mtime_ns, digest]), or None if there is no usable
+    snapshot.
+    """
+    path = path_for(directory, filename)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        return None
+    try:
+        (length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        header_end = len(MAGIC) + 8 + length
+        header = json.loads(buffer[len(MAGIC) + 8:header_end])
+    except (struct.error, ValueError):
+        return None
+    if header["byteorder"] != sys.byteorder:
+        return None
+
+    start = _aligned(header_end)
+    view = memoryview(buffer)
+    arrays = {}
+    for name, (offset, nbytes, fmt) in header["arrays"].items():
+        begin = start + offset
+        arrays[name] = view[begin:begin + nbytes].cast(fmt)
+    strings = {}
+    for name, (offset, nbytes, count) in header["strings"].items():
+        begin = start + offset
+        if count == 0:
+            strings[name] = []
+        else:
+            blob = bytes(view[begin:begin + nbytes]).decode("utf-8")
+            strings[name] = blob.split(SEPARATOR)
+    return header["sources"], arrays, strings
+
+
+def _aligned(offset):
+    return (offset + 7) & ~7
@@ -1,4 +1,10 @@
+from collections import deque
+
+
 class Node():
+    # No per-node __dict__: searches create one Node per person reached
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -38,4 +44,51 @@ class QueueFrontier(StackFrontier):
 
 """
 Parece que esta clase tan solo cambia el método remove de la primera
-"""
\ No newline at end of file
+"""
+
+
+class DequeStackFrontier():
+    """
+    Same interface as StackFrontier, but add, remove and contains_state
+    are all O(1): nodes live in a deque and their states are counted in
+    a dict alongside it.
+    """
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self): # Devuelve el último nodo de la frontera
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self._forget(node.state)
+            return node
+
+    def _forget(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self): # Devuelve el primer nodo de la frontera
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self._forget(node.state)
+            return node
@@ -0,0 +1,162 @@
+"""
+NumPy, direction-optimizing BFS over the CSR arrays of a Graph.
+
+Every level is processed as a whole with array operations instead of a
+Python loop per person:
+
+  1. the frontier's movies are gathered and the ones not seen before
+     become this level's movies (each remembers one frontier person);
+  2. the people behind those movies are found either
+       top-down:  gathering the cast of this level's movies, or
+       bottom-up: checking every unvisited person's movies against them,
+     whichever touches fewer edges (Beamer's direction-optimizing BFS).
+
+Requires numpy (see requirements.txt).
+"""
+
+import numpy as np
+
+
+# Go bottom-up once the new movies' casts hold more than 1/ALPHA of the
+# edges still leading to unvisited people
+ALPHA = 14
+
+TOP_DOWN = "top-down"
+BOTTOM_UP = "bottom-up"
+
+
+class VectorizedBFS():
+    """
+    BFS from `source` over a Graph (or Adjacency), stopping early once
+    `target` is reached if one is given.
+
+    `distance`, `parent_person` and `parent_movie` are int32 arrays with
+    -1 for people not reached; `directions` records the strategy used for
+    each level.
+    """
+    def __init__(self, adjacency, source, target=None, movie_mask=None,
+                 alpha=ALPHA):
+        person_offsets = as_array(adjacency.person_offsets)
+        person_movies = as_array(adjacency.person_movies)
+        movie_offsets = as_array(adjacency.movie_offsets)
+        movie_people = as_array(adjacency.movie_people)
+        num_people = len(person_offsets) - 1
+        num_movies = len(movie_offsets) - 1
+
+        self.distance = np.full(num_people, -1, dtype=np.int32)
+        self.parent_person = np.full(num_people, -1, dtype=np.int32)
+        self.parent_movie = np.full(num_people, -1, dtype=np.int32)
+        self.directions = []
+
+        visited = np.zeros(num_people, dtype=bool)
+        if movie_mask is None:
+            seen_movie = np.zeros(num_movies, dtype=bool)
+        else:
+            seen_movie = np.frombuffer(movie_mask, dtype=np.uint8) == 0
+        # Person each movie was first reached from
+        movie_parent = np.full(num_movies, -1, dtype=np.int32)
+        level_movie = np.zeros(num_movies, dtype=bool)
+
+        person_degree = np.diff(person_offsets)
+        cast_size = np.diff(movie_offsets)
+        unvisited_edges = int(person_degree.sum())
+
+        frontier = np.array([source], dtype=np.int32)
+        visited[source] = True
+        self.distance[source] = 0
+        self.parent_person[source] = source
+        unvisited_edges -= int(person_degree[source])
+        level = 0
+
+        while len(frontier) and (target is None or not visited[target]):
+            # Frontier people -> movies reached for the first time
+            movies, owner = gather(person_offsets, person_movies, frontier)
+            fresh = ~seen_movie[movies]
+            movies, first = np.unique(movies[fresh], return_index=True)
+            if len(movies) == 0:
+                break
+            seen_movie[movies] = True
+            movie_parent[movies] = frontier[owner[fresh][first]]
+
+            # Movies -> people reached for the first time
+            if cast_size[movies].sum() * alpha > unvisited_edges:
+                self.directions.append(BOTTOM_UP)
+                level_movie[movies] = True
+                candidates = np.flatnonzero(~visited).astype(np.int32)
+                their_movies, owner = gather(person_offsets, person_movies,
+                                             candidates)
+                hits = np.flatnonzero(level_movie[their_movies])
+                people, first = np.unique(owner[hits], return_index=True)
+                people = candidates[people]
+                via = their_movies[hits[first]]
+                level_movie[movies] = False
+            else:
+                self.directions.append(TOP_DOWN)
+                cast, owner = gather(movie_offsets, movie_people, movies)
+                fresh = ~visited[cast]
+                people, first = np.unique(cast[fresh], return_index=True)
+                via = movies[owner[fresh][first]]
+
+            level += 1
+            visited[people] = True
+            self.distance[people] = level
+            self.parent_movie[people] = via
+            self.parent_person[people] = movie_parent[via]
+            unvisited_edges -= int(person_degree[people].sum())
+            frontier = people.astype(np.int32)
+
+    def path(self, target):
+        """
+        Returns the shortest list of (movie, person) int pairs from the
+        source to `target`, or None if the search did not reach it.
+        """
+        if self.distance[target] == -1:
+            return None
+        path = []
+        while self.parent_person[target] != target:
+            path.append((int(self.parent_movie[target]), int(target)))
+            target = self.parent_person[target]
+        path.reverse()
+        return path
+
+
+def shortest_path(adjacency, source, target, movie_mask=None):
+    """
+    Returns the shortest list of (movie, person) int pairs that connect
+    the source to the target, like Graph.shortest_path.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    connected = getattr(adjacency, "connected", None)
+    if connected is not None and not connected(source, target):
+        return None
+    return VectorizedBFS(adjacency, source, target, movie_mask).path(target)
+
+
+def as_array(values):
+    """
+    Wraps a CSR array (array.array or memoryview) as an int32 ndarray
+    without copying it.
+    """
+    return np.frombuffer(values, dtype=np.int32)
+
+
+def gather(offsets, values, nodes):
+    """
+    Concatenates the CSR rows of `nodes`.
+
+    Returns (values, owner) where owner[i] is the position in `nodes` of
+    the row values[i] came from.
+    """
+    starts = offsets[nodes].astype(np.int64)
+    lengths = offsets[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64))
+    owner = np.repeat(np.arange(len(nodes)), lengths)
+    # Position of each element within its own row, plus the row start
+    row_starts = np.cumsum(lengths) - lengths
+    index = np.arange(total) - row_starts[owner] + starts[owner]
+    return values[index], owner
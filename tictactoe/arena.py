@@ -0,0 +1,348 @@
+"""
+Headless arena for the Tic Tac Toe engines in this directory.
+
+Every engine plays every other one, once as X and once as O, with no
+pygame and no display. An engine is named by a module (its minimax(board)
+function plays), a "module.function" taking a board, or "mnk" for the
+m,n,k engine's best_move on 3x3. A
+referee built on bitboard.py applies the moves, so an engine's own rules
+are never trusted, and every move is checked against perfect play from
+solved.py.
+
+For each engine it reports the results, the moves that were not optimal,
+forfeits (a crash, timeout or illegal move loses the game), the nodes
+searched and nodes per second, move latency percentiles and the peak
+memory allocated by one move. Nodes come from the engine's own counter
+where it keeps one (tictactoe.stats, mnk.Game.stats), else from counting
+calls to its module's result function. Engines that answer from the
+solved table report lookups instead of nodes.
+
+Usage: python arena.py [engine ...]
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import signal
+import sys
+import time
+import tracemalloc
+
+import bitboard
+import solved
+
+
+ENGINES = (
+    "tictactoe",
+    "tictactoe.minimax_alphabeta",
+    "mnk",
+    "ed",
+    "tictactoe1intentoderecursividad",
+    "tictactoe2NodosyFronteras",
+    "tictactoe3",
+    "tictactoe4entregado",
+    "tictactoe5corrección",
+)
+
+# Engines that look their moves up in solved.bin instead of searching
+LOOKUPS = ("tictactoe.minimax",)
+
+# Seconds an engine may think about one move before forfeiting
+MOVE_TIMEOUT = 20
+
+# Positions each engine's memory use is measured on: after one move, two
+# moves and four moves
+MEMORY_POSITIONS = (
+    [(1, 1)],
+    [(0, 0), (1, 1)],
+    [(0, 0), (1, 1), (2, 2), (0, 2)],
+)
+
+
+class MoveTimeout(Exception):
+    pass
+
+
+class Forfeit(Exception):
+    pass
+
+
+class Engine():
+    """
+    A player: `choose(board)` returns its move. `nodes()`, if given,
+    returns the nodes its last move searched; otherwise calls to
+    `module.result` are counted. Lookup engines count no nodes.
+    """
+    def __init__(self, name, choose, module=None, nodes=None, lookup=False):
+        self.name = name
+        self.choose = choose
+        self.module = module
+        self.count_nodes = nodes
+        self.lookup = lookup
+        self.nodes = 0
+        self.latencies = []
+        self.results = {"wins": 0, "draws": 0, "losses": 0, "forfeits": 0}
+        self.moves = 0
+        self.suboptimal = 0
+        self.errors = []
+        self.peak_bytes = None
+
+    def move(self, board):
+        """
+        Asks the engine for its move on a list-of-lists board, counting
+        the nodes it searches and timing it. Raises Forfeit if it crashes
+        or runs out of time.
+        """
+        module = self.module
+        original = None
+        if not self.lookup and self.count_nodes is None:
+            original = getattr(module, "result", None)
+        counter = [0]
+
+        def counted(board, action):
+            counter[0] += 1
+            return original(board, action)
+
+        if original is not None:
+            module.result = counted
+        start = time.perf_counter()
+        try:
+            with time_limit(MOVE_TIMEOUT), quiet():
+                action = self.choose(board)
+            if self.count_nodes is not None:
+                counter[0] = self.count_nodes()
+        except MoveTimeout:
+            raise Forfeit(f"no move after {MOVE_TIMEOUT}s")
+        except Exception as e:
+            raise Forfeit(f"{type(e).__name__}: {e}")
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+            if original is not None:
+                module.result = original
+            self.nodes += counter[0]
+        return action
+
+    def measure_memory(self):
+        """
+        Records the largest peak allocation of one move over
+        MEMORY_POSITIONS.
+        """
+        peaks = []
+        for moves in MEMORY_POSITIONS:
+            state = bitboard.initial_state()
+            for action in moves:
+                state = bitboard.result(state, action)
+            tracemalloc.start()
+            try:
+                with time_limit(MOVE_TIMEOUT), quiet():
+                    self.choose(bitboard.to_board(state))
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            except Exception:
+                pass
+            finally:
+                tracemalloc.stop()
+        self.peak_bytes = max(peaks) if peaks else None
+
+    def report(self):
+        ordered = sorted(self.latencies)
+        seconds = sum(ordered)
+        report = dict(self.results)
+        report.update({
+            "moves": self.moves,
+            "suboptimal_moves": self.suboptimal,
+        })
+        # A lookup answers each move with one table read
+        count, unit = ((self.moves, "lookups") if self.lookup
+                       else (self.nodes, "nodes"))
+        report[unit] = count
+        report[f"{unit}_per_second"] = (round(count / seconds) if seconds
+                                        else None)
+        if ordered:
+            report["latency_ms"] = {
+                f"p{p}": round(percentile(ordered, p) * 1000, 3)
+                for p in (50, 95, 99)
+            }
+            report["latency_ms"]["max"] = round(ordered[-1] * 1000, 3)
+        report["peak_bytes"] = self.peak_bytes
+        if self.errors:
+            report["errors"] = sorted(set(self.errors))
+        return report
+
+
+def load(names):
+    """
+    Imports the engines. Returns ({name: Engine}, {name: error}) for the
+    ones that load and the ones that do not.
+    """
+    engines, broken = {}, {}
+    for name in names:
+        name = name.removesuffix(".py")
+        module_name, _, function_name = name.partition(".")
+        try:
+            with time_limit(MOVE_TIMEOUT), quiet():
+                module = importlib.import_module(module_name)
+        except BaseException as e:
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            broken[name] = f"{type(e).__name__}: {e}"
+            continue
+        if name == "mnk":
+            engines[name] = mnk_engine(module)
+            continue
+        function_name = function_name or "minimax"
+        choose = getattr(module, function_name, None)
+        if choose is None:
+            broken[name] = f"no {function_name} function"
+            continue
+        qualified = f"{module_name}.{function_name}"
+        nodes = None
+        stats = getattr(module, "stats", None)
+        if isinstance(stats, dict) and "nodes" in stats:
+            nodes = lambda stats=stats: stats["nodes"]
+        engines[name] = Engine(name, choose, module, nodes,
+                               lookup=qualified in LOOKUPS)
+    return engines, broken
+
+
+def mnk_engine(mnk):
+    """
+    Returns the m,n,k engine on a 3x3 board as an Engine. Its budget is
+    the move timeout, since it stops by itself once the game is solved.
+    """
+    game = mnk.Game(3, 3, 3)
+    return Engine("mnk", lambda board: game.best_move(board, MOVE_TIMEOUT),
+                  mnk, lambda: game.stats["nodes"])
+
+
+def play(x, o):
+    """
+    Plays one game from the empty board between two Engines and returns
+    its record: the moves played, the winner ("X", "O" or None) and the
+    forfeit reason if there was one.
+    """
+    state = bitboard.initial_state()
+    sides = {bitboard.X: x, bitboard.O: o}
+    record = {"x": x.name, "o": o.name, "moves": []}
+    while not bitboard.terminal(state):
+        turn = bitboard.player(state)
+        engine = sides[turn]
+        board = bitboard.to_board(state)
+        try:
+            # A fresh copy: some engines modify the board they are given
+            action = engine.move(bitboard.to_board(state))
+            if not legal(state, action):
+                raise Forfeit(f"illegal move {action!r}")
+            action = tuple(action)
+        except Forfeit as e:
+            engine.errors.append(str(e))
+            record["forfeit"] = f"{engine.name}: {e}"
+            record["winner"] = bitboard.O if turn == bitboard.X else bitboard.X
+            return record
+        engine.moves += 1
+        if action not in solved.lookup(board)[1]:
+            engine.suboptimal += 1
+        record["moves"].append(list(action))
+        state = bitboard.result(state, action)
+    record["winner"] = bitboard.winner(state)
+    return record
+
+
+def legal(state, action):
+    """
+    Returns True if `action` is an (i, j) pair (tuple or list) naming an
+    empty cell.
+    """
+    if not isinstance(action, (tuple, list)):
+        return False
+    return tuple(action) in bitboard.actions(state)
+
+
+def tournament(engines):
+    """
+    Plays a round robin (each ordered pair once) and returns the games.
+    """
+    games = []
+    for x in engines.values():
+        for o in engines.values():
+            if x is o:
+                continue
+            game = play(x, o)
+            games.append(game)
+            score(x, o, game)
+    return games
+
+
+def score(x, o, game):
+    if game["winner"] is None:
+        x.results["draws"] += 1
+        o.results["draws"] += 1
+        return
+    won, lost = (x, o) if game["winner"] == bitboard.X else (o, x)
+    won.results["wins"] += 1
+    if "forfeit" in game:
+        lost.results["forfeits"] += 1
+    else:
+        lost.results["losses"] += 1
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    """
+    Raises MoveTimeout in the block after `seconds` (SIGALRM, so only in
+    the main thread on Unix; elsewhere there is no limit).
+    """
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise MoveTimeout
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Discards anything the engines print.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def percentile(ordered, p):
+    """
+    Returns the p-th percentile (nearest rank) of an ascending list.
+    """
+    rank = max(0, -(-p * len(ordered) // 100) - 1)
+    return ordered[rank]
+
+
+def main():
+    names = sys.argv[1:] or ENGINES
+    engines, broken = load(names)
+    if len(engines) < 2:
+        sys.exit("Usage: python arena.py [engine ...] (at least two "
+                 "engines must load)")
+
+    games = tournament(engines)
+    for engine in engines.values():
+        engine.measure_memory()
+
+    report = {
+        "engines": {name: engine.report() for name, engine in engines.items()},
+        "broken": broken,
+        "games": games,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
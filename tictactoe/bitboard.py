@@ -0,0 +1,186 @@
+"""
+Bitboard backend for Tic Tac Toe.
+
+A state is a pair of 9-bit ints (x, o), one per side, where bit 3 * i + j
+is set if that side has played cell (i, j). player, actions, result,
+winner, terminal and utility take and return these pairs; from_board and
+to_board convert to and from the list-of-lists boards of tictactoe.py,
+and minimax takes a list-of-lists board so runner.py can use it as is.
+"""
+
+from functools import lru_cache
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# All 9 cells occupied
+FULL = 0b111111111
+
+# Rows, columns and diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Number of set bits of every 9-bit int
+POPCOUNT = [bin(bits).count("1") for bits in range(1 << 9)]
+
+# Cells in the order the search tries them: centre, corners, edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    return X if POPCOUNT[x] == POPCOUNT[o] else O
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {divmod(cell, 3) for cell in cells(state)}
+
+
+def cells(state):
+    """
+    Returns the empty cells as bit positions, in MOVE_ORDER.
+    """
+    taken = state[0] | state[1]
+    return [cell for cell in MOVE_ORDER if not taken >> cell & 1]
+
+
+def result(state, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    return play(state, 3 * i + j)
+
+
+def play(state, cell):
+    """
+    Returns the board after the player to move takes bit position `cell`.
+    """
+    x, o = state
+    bit = 1 << cell
+    if (x | o) & bit:
+        raise ValueError("Invalid action")
+    if POPCOUNT[x] == POPCOUNT[o]:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def has_line(bits):
+    """
+    Returns True if one side's bits cover a row, column or diagonal.
+    """
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if has_line(x):
+        return X
+    if has_line(o):
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return (x | o) == FULL or has_line(x) or has_line(o)
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if has_line(x):
+        return 1
+    if has_line(o):
+        return -1
+    return 0
+
+
+@lru_cache(maxsize=None)
+def value(state):
+    """
+    Returns the minimax value of a state (1, 0 or -1 for X).
+
+    There are only 5,478 reachable states, so every one is cached.
+    """
+    if terminal(state):
+        return utility(state)
+    values = [value(play(state, cell)) for cell in cells(state)]
+    return max(values) if player(state) == X else min(values)
+
+
+def best_cell(state):
+    """
+    Returns the bit position of an optimal move, or None if the game is
+    over.
+    """
+    if terminal(state):
+        return None
+    choose = max if player(state) == X else min
+    return choose(cells(state), key=lambda cell: value(play(state, cell)))
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on a list-of-lists
+    board.
+    """
+    cell = best_cell(from_board(board))
+    return None if cell is None else divmod(cell, 3)
+
+
+def from_board(board):
+    """
+    Converts a list-of-lists board to an (x, o) state.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, mark in enumerate(row):
+            if mark == X:
+                x |= 1 << (3 * i + j)
+            elif mark == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Converts an (x, o) state to a list-of-lists board.
+    """
+    x, o = state
+    board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append(X if x & bit else O if o & bit else EMPTY)
+        board.append(row)
+    return board
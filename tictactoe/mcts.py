@@ -0,0 +1,166 @@
+"""
+Monte Carlo Tree Search (UCT) player.
+
+Works with anything providing the player / actions / result / terminal /
+utility functions of tictactoe.py: the tictactoe module itself or an
+mnk.Game for larger boards. Each iteration walks down the tree picking
+children by their UCB1 score, adds one new node, finishes the game with
+random moves and backs the result up the path.
+
+The search is anytime: it stops after a number of iterations or a time
+budget, whichever comes first. The tree is kept between moves, so the
+part of it under the position actually reached is reused.
+"""
+
+import math
+import random
+import time
+
+# UCB1 exploration constant
+EXPLORATION = math.sqrt(2)
+
+# Iterations per move when neither a cap nor a budget is given
+DEFAULT_ITERATIONS = 1000
+
+
+class Node():
+    def __init__(self, game, board, parent=None, action=None):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        # action -> Node
+        self.children = {}
+        # A won board can still have empty cells, but no moves
+        self.terminal = game.terminal(board)
+        self.untried = [] if self.terminal else list(game.actions(board))
+        self.visits = 0
+        # Playout score for the player who made `action` (1 per win,
+        # 0.5 per draw)
+        self.score = 0.0
+
+    def ucb(self, exploration, log_visits):
+        return (self.score / self.visits
+                + exploration * math.sqrt(log_visits / self.visits))
+
+
+class MCTSPlayer():
+    def __init__(self, game, iterations=None, budget=None,
+                 exploration=EXPLORATION, seed=None):
+        if iterations is None and budget is None:
+            iterations = DEFAULT_ITERATIONS
+        self.game = game
+        self.iterations = iterations
+        self.budget = budget
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.root = None
+        # Details of the last search
+        self.stats = {"iterations": 0, "reused": 0}
+
+    def best_move(self, board, iterations=None, budget=None):
+        """
+        Returns the action (i, j) whose subtree was visited most after
+        searching from `board`, or None if the game is over.
+
+        `iterations` and `budget` (seconds) override the player's caps for
+        this move, each on its own: giving one keeps the other.
+        """
+        game = self.game
+        if game.terminal(board):
+            return None
+        if iterations is None:
+            iterations = self.iterations
+        if budget is None:
+            budget = self.budget
+        deadline = None if budget is None else time.perf_counter() + budget
+
+        root = self.reuse(board)
+        self.stats = {"iterations": 0, "reused": root.visits}
+        while ((iterations is None or self.stats["iterations"] < iterations)
+               and (deadline is None or time.perf_counter() < deadline)):
+            self.iterate(root)
+            self.stats["iterations"] += 1
+
+        if not root.children:
+            return root.untried[0]
+        return max(root.children.values(),
+                   key=lambda child: child.visits).action
+
+    def reuse(self, board):
+        """
+        Makes the node for `board` the root, keeping its subtree if the
+        board is the current root or one or two moves below it.
+        """
+        candidates = []
+        if self.root is not None:
+            candidates.append(self.root)
+            for child in self.root.children.values():
+                candidates.append(child)
+                candidates.extend(child.children.values())
+        for node in candidates:
+            if node.board == board:
+                break
+        else:
+            node = Node(self.game, board)
+        node.parent = None
+        self.root = node
+        return node
+
+    def iterate(self, root):
+        """
+        Runs one selection / expansion / playout / backpropagation pass.
+        """
+        game = self.game
+        node = root
+
+        # Selection: follow UCB1 through fully expanded nodes, stopping at
+        # the end of the game
+        while not node.terminal and not node.untried:
+            log_visits = math.log(node.visits)
+            node = max(node.children.values(),
+                       key=lambda child: child.ucb(self.exploration,
+                                                   log_visits))
+
+        # Expansion: add one untried move
+        if not node.terminal:
+            i = self.random.randrange(len(node.untried))
+            node.untried[i], node.untried[-1] = (node.untried[-1],
+                                                 node.untried[i])
+            action = node.untried.pop()
+            child = Node(game, game.result(node.board, action), node, action)
+            node.children[action] = child
+            node = child
+
+        # Playout (a finished game scores itself), then backpropagate from
+        # X's point of view
+        if node.terminal:
+            utility = game.utility(node.board)
+        else:
+            utility = self.playout(node.board)
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None:
+                mover = game.player(node.parent.board)
+                node.score += reward(utility, mover)
+            node = node.parent
+
+    def playout(self, board):
+        """
+        Finishes the game with uniformly random moves and returns its
+        utility.
+        """
+        game = self.game
+        while not game.terminal(board):
+            board = game.result(board,
+                                self.random.choice(list(game.actions(board))))
+        return game.utility(board)
+
+
+def reward(utility, mover):
+    """
+    Converts a utility (1 if X won) into the score for `mover`.
+    """
+    if utility == 0:
+        return 0.5
+    won = utility > 0
+    return 1.0 if won == (mover == "X") else 0.0
@@ -0,0 +1,387 @@
+"""
+m,n,k-game engine: Tic Tac Toe on an m x n board, won by k in a row.
+
+Game keeps the same player / actions / result / winner / terminal /
+utility functions as tictactoe.py (list-of-lists boards, X moves first),
+for any board size and line length. GameState offers the same functions
+on a move-aware state that only checks the lines through the last move.
+
+Since exhaustive minimax does not scale past 3x3, best_move runs an
+iterative-deepening alpha-beta search (negamax) that scores the positions
+at its depth cutoff heuristically and returns the best move found so far
+once its time budget runs out.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 10 ** 9
+
+# Check the clock every this many nodes
+CLOCK_INTERVAL = 1024
+
+# Row / column steps of the four line directions
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Timeout(Exception):
+    pass
+
+
+class Game():
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every run of k cells in a line, as flat indices (i * n + j)
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(
+                            [(i + s * di) * n + j + s * dj for s in range(k)]
+                        )
+
+        # Cells from the centre outwards, and each cell's neighbours
+        centre_i, centre_j = (m - 1) / 2, (n - 1) / 2
+        self.order = sorted(range(m * n), key=lambda cell: (
+            max(abs(cell // n - centre_i), abs(cell % n - centre_j)), cell
+        ))
+        self.neighbors = [
+            [(i + di) * n + j + dj
+             for di in (-1, 0, 1) for dj in (-1, 0, 1)
+             if (di or dj) and 0 <= i + di < m and 0 <= j + dj < n]
+            for i in range(m) for j in range(n)
+        ]
+
+        # Heuristic weight of a window holding c of one side's marks only
+        self.weights = [0] + [10 ** c for c in range(1, k)] + [WIN]
+
+        # Details of the last best_move search
+        self.stats = {"nodes": 0, "depth": 0, "completed": False}
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x = sum(row.count(X) for row in board)
+        o = sum(row.count(O) for row in board)
+        return X if x == o else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i, row in enumerate(board)
+                for j, mark in enumerate(row) if mark is EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError("Invalid action")
+        new_board = [row.copy() for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = flatten(board)
+        for window in self.windows:
+            mark = cells[window[0]]
+            if mark is not EMPTY and all(cells[c] == mark for c in window):
+                return mark
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(mark is not EMPTY for row in board for mark in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        winner = self.winner(board)
+        if winner == X:
+            return 1
+        if winner == O:
+            return -1
+        return 0
+
+    def state(self, board):
+        """
+        Returns a GameState for a list-of-lists board.
+        """
+        cells = flatten(board)
+        return GameState(self, cells, self.player(board), None,
+                         cells.count(EMPTY), self.winner(board))
+
+    def best_move(self, board, budget=1.0, max_depth=None):
+        """
+        Returns the best action (i, j) found for the current player within
+        `budget` seconds, or None if the game is over.
+
+        Searches depth 1, 2, ... until the budget runs out, the result is
+        a proven win or loss, or the whole game tree has been searched;
+        the move from the deepest completed search is returned.
+        """
+        if self.terminal(board):
+            return None
+        deadline = time.perf_counter() + budget
+        cells = flatten(board)
+        side = self.player(board)
+        empty = cells.count(EMPTY)
+        limit = empty if max_depth is None else min(max_depth, empty)
+
+        self.stats = {"nodes": 0, "depth": 0, "completed": False}
+        best = self.ordered(cells)[0]
+        for depth in range(1, limit + 1):
+            try:
+                score, move = self.search_root(cells, side, depth, empty,
+                                               best, deadline)
+            except Timeout:
+                break
+            best = move
+            self.stats["depth"] = depth
+            self.stats["score"] = score
+            if abs(score) >= WIN - self.m * self.n or depth == empty:
+                self.stats["completed"] = True
+                break
+        return divmod(best, self.n)
+
+    def search_root(self, cells, side, depth, empty, first, deadline):
+        """
+        Searches every move to `depth`, trying `first` (the previous
+        iteration's best) before the others. Returns (score, move).
+        """
+        moves = self.ordered(cells)
+        moves.remove(first)
+        moves.insert(0, first)
+        alpha, beta = -math.inf, math.inf
+        best_score, best_move = -math.inf, first
+        for cell in moves:
+            cells[cell] = side
+            try:
+                if self.wins(cells, cell, side):
+                    score = WIN - 1
+                else:
+                    score = -self.negamax(cells, other(side), depth - 1,
+                                          -beta, -alpha, 2, empty - 1,
+                                          deadline)
+            finally:
+                cells[cell] = EMPTY
+            if score > best_score:
+                best_score, best_move = score, cell
+            alpha = max(alpha, score)
+        return best_score, best_move
+
+    def negamax(self, cells, side, depth, alpha, beta, ply, empty,
+                deadline):
+        """
+        Returns the score of the position for `side` (to move), searched
+        `depth` more plies with alpha-beta.
+        """
+        stats = self.stats
+        stats["nodes"] += 1
+        if (stats["nodes"] % CLOCK_INTERVAL == 0
+                and time.perf_counter() > deadline):
+            raise Timeout
+        if empty == 0:
+            return 0
+        if depth == 0:
+            return self.evaluate(cells, side)
+
+        best = -math.inf
+        for cell in self.ordered(cells):
+            cells[cell] = side
+            try:
+                if self.wins(cells, cell, side):
+                    score = WIN - ply
+                else:
+                    score = -self.negamax(cells, other(side), depth - 1,
+                                          -beta, -alpha, ply + 1, empty - 1,
+                                          deadline)
+            finally:
+                cells[cell] = EMPTY
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
+
+    def ordered(self, cells):
+        """
+        Returns the empty cells, those next to a mark first, each group
+        from the centre outwards.
+        """
+        near, far = [], []
+        neighbors = self.neighbors
+        for cell in self.order:
+            if cells[cell] is not EMPTY:
+                continue
+            if any(cells[c] is not EMPTY for c in neighbors[cell]):
+                near.append(cell)
+            else:
+                far.append(cell)
+        return near + far
+
+    def wins(self, cells, cell, side):
+        """
+        Returns True if `side` has k in a row through `cell`.
+        """
+        m, n, k = self.m, self.n, self.k
+        i, j = divmod(cell, n)
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = i + sign * di, j + sign * dj
+                while 0 <= r < m and 0 <= c < n and cells[r * n + c] == side:
+                    count += 1
+                    r, c = r + sign * di, c + sign * dj
+            if count >= k:
+                return True
+        return False
+
+    def evaluate(self, cells, side):
+        """
+        Heuristic score for `side`: every window still open to only one
+        side counts for it, more the more of its marks it already holds.
+        """
+        weights = self.weights
+        score = 0
+        for window in self.windows:
+            x = o = 0
+            for c in window:
+                mark = cells[c]
+                if mark == X:
+                    x += 1
+                elif mark == O:
+                    o += 1
+            if not o:
+                score += weights[x]
+            elif not x:
+                score -= weights[o]
+        return score if side == X else -score
+
+
+class GameState():
+    """
+    A position of a Game that knows the move that led to it.
+
+    The winner is found when the state is created by checking only the
+    lines through the last move, and the number of empty cells is carried
+    over from the parent, so winner, terminal and utility are O(1) and
+    result is O(k) plus a copy of the cells.
+
+    The class itself provides player / actions / result / winner /
+    terminal / utility taking a state, so it can be passed wherever the
+    tictactoe module is expected (e.g. to mcts.MCTSPlayer).
+    """
+    def __init__(self, game, cells, to_move, last_move, empty, winner):
+        self.game = game
+        self.cells = cells
+        self.to_move = to_move
+        self.last_move = last_move
+        self.empty = empty
+        self._winner = winner
+
+    def __eq__(self, other):
+        return isinstance(other, GameState) and self.cells == other.cells
+
+    def __hash__(self):
+        return hash(tuple(self.cells))
+
+    @property
+    def board(self):
+        """
+        The state as a list-of-lists board.
+        """
+        n = self.game.n
+        return [self.cells[i:i + n] for i in range(0, len(self.cells), n)]
+
+    def player(self):
+        """
+        Returns player who has the next turn on a board.
+        """
+        return self.to_move
+
+    def actions(self):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        n = self.game.n
+        return {divmod(cell, n) for cell, mark in enumerate(self.cells)
+                if mark is EMPTY}
+
+    def result(self, action):
+        """
+        Returns the state that results from making move (i, j).
+        """
+        i, j = action
+        cell = i * self.game.n + j
+        if self.cells[cell] is not EMPTY:
+            raise ValueError("Invalid action")
+        cells = self.cells.copy()
+        cells[cell] = self.to_move
+        winner = self.to_move if self.game.wins(cells, cell,
+                                                self.to_move) else None
+        return GameState(self.game, cells, other(self.to_move), action,
+                         self.empty - 1, winner)
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        return self._winner
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self._winner is not None or self.empty == 0
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if self._winner == X:
+            return 1
+        if self._winner == O:
+            return -1
+        return 0
+
+
+def flatten(board):
+    """
+    Returns the board's cells as one list, row by row.
+    """
+    return [mark for row in board for mark in row]
+
+
+def other(side):
+    return O if side == X else X
@@ -0,0 +1,221 @@
+"""
+Precomputed solution of Tic Tac Toe.
+
+Every one of the 5,478 reachable positions is solved offline and stored
+in a binary file of 3^9 16-bit entries, indexed by the board read as a
+base-3 number (empty 0, X 1, O 2). An entry holds
+
+    bits 0-8   the optimal moves, as bit positions 3 * i + j
+    bits 9-10  the minimax value + 1 (0, 1 or 2)
+    bit 15     set for reachable positions
+
+so looking up a move is a single array read. The file is memory-mapped
+the first time it is needed, and built if it does not exist yet.
+
+Usage: python solved.py [verify]
+"""
+
+import mmap
+import os
+import sys
+from array import array
+
+import bitboard
+
+
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "solved.bin")
+MAGIC = b"TTTSOLV1"
+
+SIZE = 3 ** 9
+REACHABLE = 1 << 15
+VALUE_SHIFT = 9
+MOVES_MASK = (1 << 9) - 1
+
+# Base-3 contribution of each 9-bit set of cells
+TERNARY = [sum(3 ** cell for cell in range(9) if bits >> cell & 1)
+           for bits in range(1 << 9)]
+
+# Memory-mapped entries, once loaded
+_entries = None
+
+
+def index(state):
+    """
+    Returns the table index of an (x, o) bitboard state.
+    """
+    x, o = state
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def solve():
+    """
+    Returns an array of SIZE entries solving every reachable position.
+    """
+    entries = array("H", [0]) * SIZE
+    stack = [bitboard.initial_state()]
+    while stack:
+        state = stack.pop()
+        i = index(state)
+        if entries[i]:
+            continue
+        value = bitboard.value(state)
+        moves = 0
+        if not bitboard.terminal(state):
+            for cell in bitboard.cells(state):
+                child = bitboard.play(state, cell)
+                if bitboard.value(child) == value:
+                    moves |= 1 << cell
+                stack.append(child)
+        entries[i] = REACHABLE | (value + 1) << VALUE_SHIFT | moves
+    return entries
+
+
+def write(entries, filename=FILENAME):
+    """
+    Writes the entries to `filename` (via a temporary file, so readers
+    never see a partial table).
+    """
+    temporary = f"{filename}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        entries.tofile(f)
+    os.replace(temporary, filename)
+
+
+def read(filename=FILENAME):
+    """
+    Memory-maps the table in `filename` and returns its entries, or None
+    if the file is missing or not a table.
+    """
+    try:
+        with open(filename, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if (mapped[:len(MAGIC)] != MAGIC
+            or len(mapped) != len(MAGIC) + 2 * SIZE):
+        mapped.close()
+        return None
+    return memoryview(mapped)[len(MAGIC):].cast("H")
+
+
+def entries():
+    """
+    Returns the table, loading it (or building and saving it) on first
+    use.
+    """
+    global _entries
+    if _entries is None:
+        _entries = read()
+    if _entries is None:
+        table = solve()
+        try:
+            write(table)
+        except OSError:
+            # A read-only checkout just means no saved table
+            pass
+        _entries = table
+    return _entries
+
+
+def lookup(board):
+    """
+    Returns (value, moves) for a list-of-lists board: its minimax value
+    and the set of optimal (i, j) actions, or None if the board cannot
+    arise in a game.
+    """
+    entry = entries()[index(bitboard.from_board(board))]
+    if not entry & REACHABLE:
+        return None
+    value = (entry >> VALUE_SHIFT & 3) - 1
+    moves = {divmod(cell, 3) for cell in range(9)
+             if entry >> cell & 1}
+    return value, moves
+
+
+def best_action(board):
+    """
+    Returns an optimal action for the current player on the board, or
+    None if the game is over.
+
+    Among equally good moves, the first in bitboard.MOVE_ORDER is taken.
+    Raises ValueError for boards that cannot arise in a game.
+    """
+    entry = entries()[index(bitboard.from_board(board))]
+    if not entry & REACHABLE:
+        raise ValueError("Unreachable board")
+    for cell in bitboard.MOVE_ORDER:
+        if entry >> cell & 1:
+            return divmod(cell, 3)
+    return None
+
+
+def verify():
+    """
+    Cross-checks every reachable entry against the live alpha-beta search
+    of tictactoe.py. Returns the list of boards that disagree.
+    """
+    import math
+
+    import tictactoe as ttt
+
+    def search(board):
+        if ttt.player(board) == ttt.X:
+            return ttt.maxValueAB(board, -math.inf, math.inf)
+        return ttt.minValueAB(board, -math.inf, math.inf)
+
+    table = entries()
+    wrong = []
+    for i in range(SIZE):
+        if not table[i] & REACHABLE:
+            continue
+        board = to_board(i)
+        value, moves = lookup(board)
+        expected = search(board)
+        if ttt.terminal(board):
+            best = set()
+        else:
+            best = {action for action in ttt.actions(board)
+                    if search(ttt.result(board, action)) == expected}
+        if value != expected or moves != best:
+            wrong.append(board)
+    return wrong
+
+
+def to_board(i):
+    """
+    Returns the list-of-lists board with table index `i`.
+    """
+    board = []
+    for row in range(3):
+        cells = []
+        for column in range(3):
+            i, digit = divmod(i, 3)
+            cells.append((bitboard.EMPTY, bitboard.X, bitboard.O)[digit])
+        board.append(cells)
+    return board
+
+
+def main():
+    if len(sys.argv) > 2 or sys.argv[1:] not in ([], ["verify"]):
+        sys.exit("Usage: python solved.py [verify]")
+
+    if sys.argv[1:] == ["verify"]:
+        wrong = verify()
+        for board in wrong:
+            print(f"Mismatch: {board}")
+        reachable = sum(1 for entry in entries() if entry & REACHABLE)
+        print(f"Checked {reachable} positions, {len(wrong)} mismatches.")
+        if wrong:
+            sys.exit(1)
+        return
+
+    table = solve()
+    write(table)
+    reachable = sum(1 for entry in table if entry & REACHABLE)
+    print(f"Solved {reachable} positions, saved to {FILENAME}")
+
+
+if __name__ == "__main__":
+    main()